@@ -0,0 +1,3 @@
+"""
+Benchmarks for arranges. Run them with `python -m benchmarks --help`
+"""
@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from arranges import cache
+
+from . import bench_dict, bench_ranges, bench_segment  # noqa: F401 (registers cases)
+from .harness import LAYOUTS, SIZES, compare, load, run, save
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmark arranges"
+    )
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("-k", "--match", default="", help="only run matching cases")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(n) for n in SIZES),
+        help="comma-separated segment counts",
+    )
+    parser.add_argument(
+        "--layouts",
+        default=",".join(layout.name for layout in LAYOUTS),
+        help="comma-separated input layouts",
+    )
+    parser.add_argument(
+        "--budget", type=float, default=0.5, help="seconds to spend per case"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="leave the parse caches on (they're off by default so repeated "
+        "runs measure real work)",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="compare two result files instead of running anything",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(load(args.compare[0]), load(args.compare[1]))
+        return
+
+    if not args.cache:
+        cache.configure(**{name: 0 for name in cache.stats()})
+
+    sizes = [int(n) for n in args.sizes.split(",")]
+    names = args.layouts.split(",")
+    layouts = [layout for layout in LAYOUTS if layout.name in names]
+
+    results = run(sizes, layouts, args.match, args.budget)
+
+    if args.output:
+        save(results, args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Dict reads, writes and a mix of the two
+"""
+
+from arranges import Dict
+
+from .harness import benchmark, make_bounds
+
+
+def spans(n, layout):
+    return [slice(start, stop) for start, stop in make_bounds(n, layout)]
+
+
+@benchmark("dict.write", spans)
+def write(spans):
+    d = Dict()
+    for i, span in enumerate(spans):
+        d[span] = i % 7
+
+
+def filled(n, layout):
+    keys = spans(n, layout)
+    d = Dict()
+    for i, key in enumerate(keys):
+        d[key] = i % 7
+    return d, keys
+
+
+@benchmark("dict.read", filled)
+def read(filled):
+    d, keys = filled
+    for key in keys:
+        d[key.start]
+
+
+@benchmark("dict.overwrite", filled)
+def overwrite(filled):
+    d, keys = filled
+    for key in keys:
+        d[key] = "x"
+
+
+@benchmark("dict.mixed", filled)
+def mixed(filled):
+    d, keys = filled
+    for key in keys:
+        d[key.start : key.start + 1] = "y"
+        d[key.start]
+
+
+@benchmark("dict.copy", filled)
+def copy(filled):
+    d, _ = filled
+    d.copy()[0] = "z"
+
+
+@benchmark("dict.eq", filled)
+def eq(filled):
+    d, _ = filled
+    d == d.copy()
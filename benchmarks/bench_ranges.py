@@ -0,0 +1,144 @@
+"""
+Ranges construction, set operators and membership
+"""
+
+import random
+from array import array
+
+from arranges import Ranges, RangesBuilder
+
+from .harness import benchmark, bounds_to_str, make_bounds, shift
+
+
+def canonical(n, layout):
+    return bounds_to_str(make_bounds(n, layout))
+
+
+@benchmark("ranges.from_str", canonical)
+def from_str(text):
+    Ranges(text)
+
+
+def ints(n, layout):
+    return [i for start, stop in make_bounds(n, layout) for i in range(start, stop)]
+
+
+@benchmark("ranges.from_ints", ints)
+def from_ints(ints):
+    Ranges(ints)
+
+
+def int_array(n, layout):
+    return array("q", ints(n, layout))
+
+
+@benchmark("ranges.from_array", int_array)
+def from_array(values):
+    Ranges.from_array(values)
+
+
+def range_objects(n, layout):
+    return [range(start, stop) for start, stop in make_bounds(n, layout)]
+
+
+@benchmark("ranges.from_iterable", range_objects)
+def from_iterable(ranges):
+    Ranges(ranges)
+
+
+def operands(n, layout):
+    """
+    Two ranges that partly overlap each other
+    """
+    bounds = make_bounds(n, layout)
+    a = Ranges(bounds_to_str(bounds))
+    b = Ranges(bounds_to_str(shift(bounds, 3)))
+    return a, b
+
+
+@benchmark("ranges.and", operands)
+def and_(operands):
+    a, b = operands
+    a & b
+
+
+@benchmark("ranges.or", operands)
+def or_(operands):
+    a, b = operands
+    a | b
+
+
+@benchmark("ranges.sub", operands)
+def sub(operands):
+    a, b = operands
+    a - b
+
+
+@benchmark("ranges.xor", operands)
+def xor(operands):
+    a, b = operands
+    (a | b) - (a & b)
+
+
+@benchmark("ranges.invert", operands)
+def invert(operands):
+    a, _ = operands
+    ~a
+
+
+@benchmark("ranges.intersects", operands)
+def intersects(operands):
+    a, b = operands
+    a.intersects(b)
+
+
+@benchmark("ranges.eq", operands)
+def eq(operands):
+    a, b = operands
+    a == b
+
+
+@benchmark("ranges.subset", operands)
+def subset(operands):
+    a, b = operands
+    a <= a | b
+
+
+@benchmark("ranges.len", operands)
+def len_(operands):
+    a, _ = operands
+    len(a)
+
+
+def points(n, layout):
+    bounds = make_bounds(n, layout)
+    r = Ranges(bounds_to_str(bounds))
+    return r, range(0, bounds[-1][1], max(1, bounds[-1][1] // n))
+
+
+@benchmark("ranges.contains_int", points)
+def contains_int(points):
+    r, values = points
+    for value in values:
+        value in r
+
+
+@benchmark("ranges.iter", operands, max_size=100_000)
+def iter_(operands):
+    a, _ = operands
+    for _ in a:
+        pass
+
+
+def shuffled(n, layout):
+    values = ints(n, layout)
+    random.Random(0).shuffle(values)
+    return values
+
+
+@benchmark("ranges.builder", shuffled)
+def builder(values):
+    b = RangesBuilder()
+    for value in values:
+        b.add(value)
+    b.build()
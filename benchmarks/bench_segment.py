@@ -0,0 +1,39 @@
+"""
+Segment construction and comparison
+"""
+
+from arranges import Segment
+
+from .harness import benchmark, bounds_to_str, make_bounds
+
+
+def pieces(n, layout):
+    return bounds_to_str(make_bounds(n, layout)).split(",")
+
+
+@benchmark("segment.from_str", pieces)
+def from_str(pieces):
+    for piece in pieces:
+        Segment.from_str(piece)
+
+
+@benchmark("segment.init", make_bounds)
+def init(bounds):
+    for start, stop in bounds:
+        Segment(start, stop)
+
+
+def segments(n, layout):
+    return [Segment(start, stop) for start, stop in make_bounds(n, layout)]
+
+
+@benchmark("segment.union", segments)
+def union(segments):
+    for segment in segments:
+        segment | segment
+
+
+@benchmark("segment.contains_int", segments)
+def contains_int(segments):
+    for segment in segments:
+        segment.start in segment
@@ -0,0 +1,200 @@
+"""
+A tiny benchmark harness: a registry of cases, input generators, a timer and
+JSON in/out so results can be compared between commits.
+"""
+
+import itertools
+import json
+import platform
+import random
+import subprocess
+import time
+from typing import Any, Callable, NamedTuple
+
+SIZES = (10, 1_000, 100_000, 1_000_000)
+"""
+Segment counts that every case is run over, unless told otherwise
+"""
+
+
+class Layout(NamedTuple):
+    """
+    The shape of generated input: how much of the address space is covered,
+    and whether segment and gap sizes vary.
+    """
+
+    name: str
+    density: float
+    fragmented: bool
+
+
+LAYOUTS = (
+    Layout("sparse", 0.1, False),
+    Layout("dense", 0.9, False),
+    Layout("fragmented", 0.5, True),
+)
+
+
+class Case(NamedTuple):
+    """
+    A registered benchmark. setup(n, layout) builds whatever run() needs, so
+    that only run() is timed.
+    """
+
+    name: str
+    setup: Callable[[int, Layout], Any]
+    run: Callable[[Any], Any]
+    max_size: int | None
+
+
+_cases: list[Case] = []
+
+
+def benchmark(name: str, setup: Callable, max_size: int | None = None):
+    """
+    Register a function as a benchmark case
+    """
+
+    def decorator(run: Callable) -> Callable:
+        _cases.append(Case(name, setup, run, max_size))
+        return run
+
+    return decorator
+
+
+def make_bounds(n: int, layout: Layout, seed: int = 0) -> list[tuple[int, int]]:
+    """
+    Make n sorted, disjoint, non-adjacent (start, stop) pairs.
+
+    Segments average 8 long so iterating the values stays cheap; gaps are
+    sized to give the layout's density. Fragmented layouts are made of
+    single values with random gaps.
+    """
+    rng = random.Random(seed)
+    size = 1 if layout.fragmented else 8
+    gap = max(1, round(size * (1 - layout.density) / layout.density))
+
+    bounds = []
+    pos = 0
+    for _ in range(n):
+        if layout.fragmented:
+            length, space = 1, rng.randint(1, 2 * gap)
+        else:
+            length, space = size, gap
+        bounds.append((pos, pos + length))
+        pos += length + space
+    return bounds
+
+
+def bounds_to_str(bounds: list[tuple[int, int]]) -> str:
+    """
+    Canonical string for a list of bounds
+    """
+    return ",".join(
+        str(start) if stop == start + 1 else f"{start or ''}:{stop}"
+        for start, stop in bounds
+    )
+
+
+def shift(bounds: list[tuple[int, int]], offset: int) -> list[tuple[int, int]]:
+    """
+    Move bounds along by offset, to make a partly overlapping operand
+    """
+    return [(start + offset, stop + offset) for start, stop in bounds]
+
+
+def time_case(case: Case, n: int, layout: Layout, budget: float) -> dict:
+    """
+    Time a single case, calling it until the budget is used up or it's been
+    run enough times, and keep the fastest run.
+    """
+    state = case.setup(n, layout)
+    times = []
+    total = 0.0
+
+    while total < budget and len(times) < 100:
+        start = time.perf_counter()
+        case.run(state)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+
+    return {
+        "name": case.name,
+        "size": n,
+        "layout": layout.name,
+        "best": min(times),
+        "mean": total / len(times),
+        "runs": len(times),
+    }
+
+
+def run(
+    sizes=SIZES, layouts=LAYOUTS, match: str = "", budget: float = 0.5, log=print
+) -> list[dict]:
+    """
+    Run every registered case that matches, over every size and layout
+    """
+    results = []
+    for case, n, layout in itertools.product(_cases, sizes, layouts):
+        if match not in case.name:
+            continue
+        if case.max_size and n > case.max_size:
+            continue
+        result = time_case(case, n, layout, budget)
+        log(f"{case.name:<32} {n:>9} {layout.name:<12} {result['best']:.6f}s")
+        results.append(result)
+    return results
+
+
+def metadata() -> dict:
+    """
+    Where the results came from
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def save(results: list[dict], path: str):
+    """
+    Write results and metadata out as JSON
+    """
+    with open(path, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+
+def load(path: str) -> dict:
+    """
+    Read results saved with save()
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(before: dict, after: dict, log=print):
+    """
+    Print the ratio of the best times for every result found in both files
+    """
+
+    def key(result):
+        return result["name"], result["size"], result["layout"]
+
+    old = {key(r): r["best"] for r in before["results"]}
+    for result in after["results"]:
+        if key(result) not in old:
+            continue
+        ratio = result["best"] / old[key(result)]
+        name, size, layout = key(result)
+        log(f"{name:<32} {size:>9} {layout:<12} {ratio:6.2f}x")
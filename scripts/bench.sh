@@ -0,0 +1,6 @@
+#!/usr/bin/env bash
+
+source .venv/bin/activate
+
+mkdir -p .benchmarks
+python -m benchmarks -o ".benchmarks/$(git rev-parse --short HEAD).json" "$@"
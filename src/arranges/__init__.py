@@ -1,4 +1,7 @@
 from arranges.ranges import Ranges  # noqa
 from arranges.segment import Segment  # noqa
-from arranges.dict import Dict  # noqa
+from arranges.dict import Dict, PersistentDict  # noqa
+from arranges.builder import RangesBuilder  # noqa
 from arranges.utils import inf  # noqa
+from arranges import cache  # noqa
+from arranges import io  # noqa
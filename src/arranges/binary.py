@@ -0,0 +1,140 @@
+"""
+A compact binary form for bounds, for storing lots of Ranges.
+
+It's a varint count of segments, followed by two varints per segment: the gap
+since the end of the last one (or the start, for the first) and its length.
+Every real segment has a length of at least 1, so a length of 0 marks an
+unbounded last segment. Varints are unsigned LEB128, seven bits per byte with
+the high bit set on all but the last.
+"""
+
+from array import array
+
+try:
+    import numpy as np
+
+    NUMPY = True
+except ImportError:
+    NUMPY = False
+
+from arranges.utils import inf
+
+
+def _put(out: bytearray, value: int):
+    """
+    Append a varint
+    """
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Read a varint at pos, returning it and the position after it
+    """
+    value = shift = 0
+    try:
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value, pos
+            shift += 7
+    except IndexError:
+        raise ValueError("Truncated varint in encoded ranges") from None
+
+
+def encode_bounds(starts: array, stops: array) -> bytes:
+    """
+    Encode sorted, merged bounds
+    """
+    out = bytearray()
+    _put(out, len(starts))
+
+    pos = 0
+    for start, stop in zip(starts, stops):
+        _put(out, start - pos)
+        _put(out, 0 if stop >= inf.huge else stop - start)
+        pos = stop
+    return bytes(out)
+
+
+def _decode_numpy(data: bytes) -> tuple[array, array]:
+    """
+    Decode with numpy, by finding the last byte of every varint and summing
+    the shifted 7-bit groups between them.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    last = raw < 0x80
+    if not last[-1]:
+        raise ValueError("Truncated varint in encoded ranges")
+
+    ends = np.flatnonzero(last)
+    firsts = np.concatenate(([0], ends[:-1] + 1))
+    place = np.arange(len(raw)) - np.repeat(firsts, ends - firsts + 1)
+    if place.max() > 8:
+        raise ValueError("Encoded ranges are too big")
+
+    groups = (raw & 0x7F).astype(np.uint64) << (7 * place).astype(np.uint64)
+    values = np.add.reduceat(groups, firsts)
+
+    count = int(values[0])
+    if len(values) != 1 + 2 * count:
+        raise ValueError("Encoded ranges have the wrong number of values")
+    if not count:
+        return array("q"), array("q")
+
+    gaps, lengths = values[1::2], values[2::2]
+    if not (gaps[1:].all() and lengths[:-1].all()):
+        raise ValueError("Encoded ranges have touching or unbounded segments")
+
+    stops = np.cumsum(gaps + lengths)
+    end = int(stops[-1])
+    wrapped = (stops[1:] < stops[:-1]).any()
+    if wrapped or end > inf.huge or (end == inf.huge and not lengths[-1]):
+        raise ValueError("Encoded ranges are too big")
+
+    starts = (stops - lengths).astype(np.int64)
+    stops = stops.astype(np.int64)
+    if not lengths[-1]:
+        stops[-1] = inf.huge
+    return array("q", starts.tobytes()), array("q", stops.tobytes())
+
+
+def decode_bounds(data: bytes | bytearray | memoryview) -> tuple[array, array]:
+    """
+    Decode bounds made by encode_bounds(), checking they're valid
+    """
+    data = bytes(data)
+    if NUMPY and data:
+        return _decode_numpy(data)
+
+    count, pos = _get(data, 0)
+    starts, stops = array("q"), array("q")
+
+    stop = 0
+    for i in range(count):
+        gap, pos = _get(data, pos)
+        length, pos = _get(data, pos)
+        if i and not gap:
+            raise ValueError("Encoded ranges have touching segments")
+
+        start = stop + gap
+        if length:
+            stop = start + length
+        elif i == count - 1:
+            stop = inf.huge
+        else:
+            raise ValueError("Only the last encoded segment can be unbounded")
+
+        if start >= inf.huge or stop > inf.huge:
+            raise ValueError("Encoded ranges are too big")
+        starts.append(start)
+        stops.append(stop)
+
+    if pos != len(data):
+        raise ValueError("Trailing data after encoded ranges")
+    return starts, stops
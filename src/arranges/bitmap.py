@@ -0,0 +1,324 @@
+"""
+A roaring-style container for bounds that are mostly lots of short segments
+close together, like every other value.
+
+The address space is split into chunks of 2**16 values. Chunks with lots of
+segments in them are stored as a bitmap in a Python int, which is 8KB however
+many segments there are. Everything else stays as start and stop arrays, so
+long runs and the unbounded end cost the same as they always did.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from heapq import merge
+
+try:
+    import numpy as np
+
+    NUMPY = True
+except ImportError:
+    NUMPY = False
+
+from arranges.mask import bounds_to_mask, mask_to_bounds
+from arranges.utils import inf
+
+CHUNK_BITS = 16
+CHUNK = 1 << CHUNK_BITS
+
+DENSE_RUNS = 1024
+"""
+How many segments need to start in a chunk before it's stored as a bitmap.
+That's 16KB of start and stop arrays against an 8KB bitmap.
+"""
+
+_REVERSE = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+"""
+Table to flip the bits in a byte, between int.to_bytes order (lowest bit
+first) and the packed masks in arranges.mask (highest bit first)
+"""
+
+
+class Bitmap:
+    """
+    Bounds stored as bitmaps for dense chunks, and start and stop arrays for
+    the rest. The two never overlap.
+    """
+
+    __slots__ = ("chunks", "runs")
+
+    def __init__(self, chunks: dict[int, int], runs: tuple[array, array]):
+        self.chunks = chunks  # chunk number: bitmap, in order
+        self.runs = runs  # bounds outside the chunks
+
+    def count(self) -> int:
+        """
+        How many values there are, counting inf.huge for no end like
+        Ranges.__len__ does
+        """
+        runs = self.runs
+        if runs[1] and runs[1][-1] >= inf.huge:
+            # the unbounded segment might start in a chunk
+            return sum(
+                inf.huge if stop >= inf.huge else stop - start
+                for start, stop in zip(*self.bounds())
+            )
+
+        total = sum(bits.bit_count() for bits in self.chunks.values())
+        for start, stop in zip(*runs):
+            total += stop - start
+        return total
+
+    def first(self) -> int:
+        """
+        The lowest value in here
+        """
+        firsts = [self.runs[0][0]] if self.runs[0] else []
+        if self.chunks:
+            key, bits = next(iter(self.chunks.items()))
+            firsts.append((key << CHUNK_BITS) + (bits & -bits).bit_length() - 1)
+        return min(firsts)
+
+    def stop(self) -> int:
+        """
+        Where the last segment stops, inf.huge if it doesn't
+        """
+        stops = [self.runs[1][-1]] if self.runs[1] else []
+        if self.chunks:
+            key, bits = next(reversed(self.chunks.items()))
+            stops.append((key << CHUNK_BITS) + bits.bit_length())
+        return max(stops)
+
+    def covers(self, value: int) -> bool:
+        """
+        True if value is in here
+        """
+        bits = self.chunks.get(value >> CHUNK_BITS)
+        if bits is not None:
+            return bool(bits >> (value & (CHUNK - 1)) & 1)
+
+        starts, stops = self.runs
+        i = bisect_right(starts, value) - 1
+        return i >= 0 and value < stops[i]
+
+    def bounds(self) -> tuple[array, array]:
+        """
+        Unpack into merged start and stop arrays
+        """
+        if NUMPY:
+            return _unpack_numpy(self)
+
+        pieces = []
+        for key, bits in self.chunks.items():
+            data = bits.to_bytes(CHUNK // 8, "little").translate(_REVERSE)
+            offset = key << CHUNK_BITS
+            starts, stops = mask_to_bounds(data)
+            pieces.append(
+                zip([s + offset for s in starts], [s + offset for s in stops])
+            )
+
+        starts, stops = array("q"), array("q")
+        for start, stop in merge(zip(*self.runs), *pieces):
+            # bits at the edge of a chunk can touch a run next to it
+            if stops and start == stops[-1]:
+                stops[-1] = stop
+            else:
+                starts.append(start)
+                stops.append(stop)
+        return starts, stops
+
+
+def chunk_bits(store: "tuple[array, array] | Bitmap", key: int) -> int:
+    """
+    The bitmap for one chunk of some bounds, however they're stored
+    """
+    if type(store) is Bitmap:
+        if key in store.chunks:
+            return store.chunks[key]
+        store = store.runs
+
+    starts, stops = store
+    base = key << CHUNK_BITS
+    bits = 0
+    i = max(bisect_right(starts, base) - 1, 0)
+    while i < len(starts) and starts[i] < base + CHUNK:
+        start, stop = max(starts[i], base), min(stops[i], base + CHUNK)
+        if start < stop:
+            bits |= ((1 << (stop - start)) - 1) << (start - base)
+        i += 1
+    return bits
+
+
+def chunk_bounds(keys: list[int]) -> tuple[array, array]:
+    """
+    The merged bounds covering some chunks, given in order
+    """
+    starts, stops = array("q"), array("q")
+    for key in keys:
+        if stops and stops[-1] == key << CHUNK_BITS:
+            stops[-1] += CHUNK
+        else:
+            starts.append(key << CHUNK_BITS)
+            stops.append((key + 1) << CHUNK_BITS)
+    return starts, stops
+
+
+def is_dense(bits: int) -> bool:
+    """
+    True if a chunk's bitmap has enough runs in it to be kept as one
+    """
+    return (bits ^ (bits << 1)).bit_count() // 2 >= DENSE_RUNS
+
+
+def _join(starts, stops) -> tuple[array, array]:
+    """
+    Sort numpy bounds that don't overlap, join up the ones that touch and
+    pack them into arrays
+    """
+    if not len(starts):
+        return array("q"), array("q")
+
+    order = np.argsort(starts, kind="stable")
+    starts, stops = starts[order], stops[order]
+    gap = starts[1:] != stops[:-1]
+    starts = starts[np.concatenate(([True], gap))]
+    stops = stops[np.concatenate((gap, [True]))]
+    return array("q", starts.tobytes()), array("q", stops.tobytes())
+
+
+def _unpack_numpy(bitmap: Bitmap) -> tuple[array, array]:
+    """
+    Bitmap.bounds() with numpy, finding the edges in every chunk at once
+    """
+    keys = list(bitmap.chunks)
+    data = b"".join(
+        bits.to_bytes(CHUNK // 8, "little") for bits in bitmap.chunks.values()
+    )
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+
+    # pad each chunk with a zero so runs stop at the chunk's edge
+    bits = np.pad(bits.reshape(len(keys), CHUNK), ((0, 0), (1, 1))).ravel()
+    change = np.diff(bits.view(np.int8))
+    rows = CHUNK + 2
+    bases = np.array(keys, dtype=np.int64) << CHUNK_BITS
+
+    ups, downs = np.flatnonzero(change == 1), np.flatnonzero(change == -1)
+    starts = bases[ups // rows] + ups % rows
+    stops = bases[downs // rows] + downs % rows
+
+    run_starts, run_stops = bitmap.runs
+    starts = np.concatenate((starts, np.frombuffer(run_starts, dtype=np.int64)))
+    stops = np.concatenate((stops, np.frombuffer(run_stops, dtype=np.int64)))
+    return _join(starts, stops)
+
+
+def _dense_chunks(starts: array) -> list[int]:
+    """
+    The chunks that enough segments start in to be worth a bitmap, in order
+    """
+    if NUMPY:
+        # starts are sorted, so each chunk's starts are next to each other
+        keys = np.frombuffer(starts, dtype=np.int64) >> CHUNK_BITS
+        firsts = np.flatnonzero(np.diff(keys, prepend=-1))
+        counts = np.diff(firsts, append=len(keys))
+        return keys[firsts[counts >= DENSE_RUNS]].tolist()
+
+    counts = Counter(start >> CHUNK_BITS for start in starts)
+    return sorted(key for key, count in counts.items() if count >= DENSE_RUNS)
+
+
+def _pack_numpy(starts: array, stops: array, dense: list[int]) -> Bitmap:
+    """
+    pack() with numpy. Segments that cross a chunk edge are split in a loop,
+    there aren't many of those when things are dense.
+    """
+    starts = np.frombuffer(starts, dtype=np.int64)
+    stops = np.frombuffer(stops, dtype=np.int64)
+    keys = np.array(dense, dtype=np.int64)
+
+    dense_set = set(dense)
+    crossing = (starts >> CHUNK_BITS) != ((stops - 1) >> CHUNK_BITS)
+    pieces = ([], [])
+    for start, stop in zip(starts[crossing].tolist(), stops[crossing].tolist()):
+        while start < stop:
+            end = min(stop, ((start >> CHUNK_BITS) + 1) << CHUNK_BITS)
+            pieces[0].append(start)
+            pieces[1].append(end)
+            start = end
+            if start >> CHUNK_BITS not in dense_set:
+                # no need to cut up the bits between dense chunks
+                i = bisect_right(dense, start >> CHUNK_BITS)
+                end = min(stop, dense[i] << CHUNK_BITS) if i < len(dense) else stop
+                if start < end:
+                    pieces[0].append(start)
+                    pieces[1].append(end)
+                start = end
+
+    starts = np.concatenate((starts[~crossing], np.array(pieces[0], dtype=np.int64)))
+    stops = np.concatenate((stops[~crossing], np.array(pieces[1], dtype=np.int64)))
+
+    # which dense chunk each piece is in, if any
+    rank = np.searchsorted(keys, starts >> CHUNK_BITS)
+    rank[rank == len(keys)] = 0
+    inside = keys[rank] == starts >> CHUNK_BITS
+
+    # fill all the bitmaps at once with a running sum of +1 at each start
+    # and -1 at each stop
+    offset = rank[inside] * CHUNK - (keys[rank[inside]] << CHUNK_BITS)
+    size = len(keys) * CHUNK + 1
+    edges = np.bincount(starts[inside] + offset, minlength=size)
+    edges -= np.bincount(stops[inside] + offset, minlength=size)
+    data = np.packbits(np.cumsum(edges[:-1]) > 0, bitorder="little").tobytes()
+
+    width = CHUNK // 8
+    chunks = {
+        key: int.from_bytes(data[i * width : (i + 1) * width], "little")
+        for i, key in enumerate(dense)
+    }
+    return Bitmap(chunks, _join(starts[~inside], stops[~inside]))
+
+
+def pack(bounds: tuple[array, array]) -> "tuple[array, array] | Bitmap":
+    """
+    Store bounds in whatever takes up less space: as they are, or as a
+    Bitmap if some chunks are full of short segments.
+    """
+    starts, stops = bounds
+    if len(starts) < DENSE_RUNS:
+        return bounds
+
+    dense = _dense_chunks(starts)
+    if not dense:
+        return bounds
+    if NUMPY:
+        return _pack_numpy(starts, stops, dense)
+
+    local = {key: (array("q"), array("q")) for key in dense}
+    run_starts, run_stops = array("q"), array("q")
+
+    for start, stop in zip(starts, stops):
+        pos = start
+        while pos < stop:
+            key = pos >> CHUNK_BITS
+            base = key << CHUNK_BITS
+            if key in local:
+                end = min(stop, base + CHUNK)
+                local[key][0].append(pos - base)
+                local[key][1].append(end - base)
+            else:
+                # skip to the next dense chunk, or the end
+                i = bisect_right(dense, key)
+                end = min(stop, dense[i] << CHUNK_BITS) if i < len(dense) else stop
+                if run_stops and run_stops[-1] == pos:
+                    run_stops[-1] = end
+                else:
+                    run_starts.append(pos)
+                    run_stops.append(end)
+            pos = end
+
+    chunks = {}
+    for key, (chunk_starts, chunk_stops) in local.items():
+        mask = bounds_to_mask(chunk_starts, chunk_stops, CHUNK, packed=True)
+        chunks[key] = int.from_bytes(mask.translate(_REVERSE), "little")
+
+    return Bitmap(chunks, (run_starts, run_stops))
@@ -0,0 +1,193 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import heappop, heappush
+from typing import Iterable
+
+from arranges.ranges import Ranges
+from arranges.segment import fix_start_stop, range_idx
+from arranges.sweep import Bounds, subtract, union
+from arranges.utils import inf
+
+
+class RangesBuilder:
+    """
+    A mutable accumulator for building a Ranges one piece at a time.
+
+    Values that arrive in order are joined on to the end straight away.
+    Out-of-order ones, and anything discarded while those are waiting, are
+    buffered and sorted into place in batches, so adding and discarding are
+    amortised O(log n) however the input is ordered. Call build() to get a
+    canonical Ranges out.
+    """
+
+    def __init__(self):
+        self._starts = array("q")  # sorted, merged span starts
+        self._stops = array("q")  # span stops, same order as _starts
+        self._pending = []  # (start, stop, added) spans not merged yet, oldest first
+
+    def add(self, value: int):
+        """
+        Add a single value
+        """
+        self.add_segment(value, value + 1)
+
+    def add_segment(self, start: range_idx, stop: range_idx = None):
+        """
+        Add everything from start up to stop. A stop of None is unbounded.
+        """
+        start, stop = fix_start_stop(start, stop)
+        if start == stop:
+            return
+        self._add(start, inf.huge if stop == inf else stop)
+
+    def _add(self, start: int, stop: int):
+        """
+        Add a span that's already been checked, with inf.huge for no end
+        """
+        starts, stops = self._starts, self._stops
+
+        # Fast path for things that arrive in order
+        if not self._pending and (not stops or start >= starts[-1]):
+            if stops and start <= stops[-1]:
+                stops[-1] = max(stops[-1], stop)
+            else:
+                starts.append(start)
+                stops.append(stop)
+            return
+
+        self._queue(start, stop, True)
+
+    def _queue(self, start: int, stop: int, added: bool):
+        """
+        Buffer an add or discard, merging the buffer once it gets as big as
+        the spans it'll be merged into
+        """
+        self._pending.append((start, stop, added))
+        if len(self._pending) > max(64, len(self._starts)):
+            self._flush()
+
+    def add_pairs(self, pairs: Iterable[tuple[int, int]]):
+        """
+        Add (start, stop) pairs that have already been through fix_start_stop,
+        with inf.huge for no end. Empty ones are skipped.
+        """
+        for start, stop in pairs:
+            if start < stop:
+                self._add(start, stop)
+
+    def discard(self, value: int):
+        """
+        Remove a single value, if it's there
+        """
+        self.discard_segment(value, value + 1)
+
+    def discard_segment(self, start: range_idx, stop: range_idx = None):
+        """
+        Remove everything from start up to stop, if it's there
+        """
+        start, stop = fix_start_stop(start, stop)
+        if start == stop:
+            return
+        if stop == inf:
+            stop = inf.huge
+
+        # It has to happen after what's waiting, so wait with it
+        if self._pending:
+            self._queue(start, stop, False)
+            return
+
+        starts, stops = self._starts, self._stops
+
+        # Spans that overlap start:stop
+        lo = bisect_right(starts, start) - 1
+        if lo < 0 or stops[lo] <= start:
+            lo += 1
+        hi = bisect_left(starts, stop, lo)
+        if lo == hi:
+            return
+
+        # Keep the bits that hang off either end
+        new_starts, new_stops = array("q"), array("q")
+        if starts[lo] < start:
+            new_starts.append(starts[lo])
+            new_stops.append(start)
+        if stops[hi - 1] > stop:
+            new_starts.append(stop)
+            new_stops.append(stops[hi - 1])
+
+        starts[lo:hi] = new_starts
+        stops[lo:hi] = new_stops
+
+    def build(self) -> Ranges:
+        """
+        Get the canonical Ranges for everything added so far. The builder can
+        still be used afterwards.
+        """
+        return Ranges._from_bounds(self.bounds())
+
+    def bounds(self) -> Bounds:
+        """
+        Get the merged starts and stops of everything added so far, with
+        inf.huge for no end, without making a Ranges
+        """
+        self._flush()
+        return self._starts[:], self._stops[:]
+
+    def _flush(self):
+        """
+        Sort the pending spans and merge them into the main ones
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        if all(added for _, _, added in pending):
+            added = _merge_sorted(sorted(pending))
+            self._starts, self._stops = union((self._starts, self._stops), added)
+            return
+
+        added, discarded = _latest(pending)
+        kept = subtract((self._starts, self._stops), discarded)
+        self._starts, self._stops = union(kept, added)
+
+
+def _merge_sorted(spans) -> tuple[array, array]:
+    """
+    Bounds from (start, stop, ...) spans sorted by start, joining the ones
+    that overlap or touch
+    """
+    starts, stops = array("q"), array("q")
+    for start, stop, *_ in spans:
+        if stops and start <= stops[-1]:
+            stops[-1] = max(stops[-1], stop)
+        else:
+            starts.append(start)
+            stops.append(stop)
+    return starts, stops
+
+
+def _latest(pending: list) -> tuple[tuple[array, array], tuple[array, array]]:
+    """
+    Split some buffered adds and discards, oldest first, into the bounds
+    that were last added and the bounds that were last discarded.
+
+    Sweeps across every edge keeping a heap of the spans that cover it, so
+    the newest one is on top.
+    """
+    edges = sorted({x for start, stop, _ in pending for x in (start, stop)})
+    order = sorted(range(len(pending)), key=lambda i: pending[i][0])
+
+    added, discarded = [], []
+    covering = []  # (-age, stop, added)
+    j = 0
+    for pos, end in zip(edges, edges[1:]):
+        while j < len(order) and pending[order[j]][0] == pos:
+            _, stop, is_add = pending[order[j]]
+            heappush(covering, (-order[j], stop, is_add))
+            j += 1
+        while covering and covering[0][1] <= pos:
+            heappop(covering)
+        if covering:
+            (added if covering[0][2] else discarded).append((pos, end))
+
+    return _merge_sorted(added), _merge_sorted(discarded)
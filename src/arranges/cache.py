@@ -0,0 +1,176 @@
+"""
+Caches for parsed ranges, so they can be sized, inspected and cleared from one
+place rather than being hidden inside `lru_cache`s.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from threading import RLock
+from typing import Any, Callable, NamedTuple
+
+DEFAULT_MAXSIZE = 128
+"""
+How many entries each cache holds unless it's configured otherwise. Same as
+`functools.lru_cache`.
+"""
+
+MEMO_LIMIT = 1024
+"""
+Iterables longer than this, or without a length like generators, skip the
+caches and are merged as they're read, so they don't get copied and kept
+alive. Change it with `set_memo_limit()`.
+"""
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics for a single cache
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    currsize: int
+
+
+class Cache:
+    """
+    A least-recently-used cache that can be resized and counts its hits,
+    misses and evictions.
+
+    A maxsize of None means unbounded and 0 turns caching off.
+    """
+
+    def __init__(self, name: str, maxsize: int | None = DEFAULT_MAXSIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = RLock()
+
+    def __call__(self, func: Callable) -> Callable:
+        """
+        Wrap a function so its results are stored in this cache
+        """
+
+        @wraps(func)
+        def wrapper(*args):
+            return self.lookup(func, args)
+
+        wrapper.cache = self
+        return wrapper
+
+    def lookup(self, func: Callable, args: tuple) -> Any:
+        """
+        Get func(*args) from the cache, calling it if it's not there
+        """
+        with self._lock:
+            if args in self._data:
+                self._data.move_to_end(args)
+                self.hits += 1
+                return self._data[args]
+            self.misses += 1
+
+        # Call it outside the lock, it might use this cache itself
+        value = func(*args)
+
+        if self.maxsize != 0:
+            with self._lock:
+                self._data[args] = value
+                self._trim()
+
+        return value
+
+    def resize(self, maxsize: int | None):
+        """
+        Change the size of the cache, evicting the oldest entries if needed
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"Cache size can't be negative ({maxsize})")
+
+        with self._lock:
+            self.maxsize = maxsize
+            self._trim()
+
+    def clear(self):
+        """
+        Empty the cache and reset its statistics
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Get the current statistics
+        """
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._data)
+        )
+
+    def _trim(self):
+        """
+        Evict the least recently used entries until we fit
+        """
+        if self.maxsize is None:
+            return
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+_caches: dict[str, Cache] = {}
+
+
+def cached(name: str) -> Cache:
+    """
+    Decorator that caches a function in a cache registered under name
+    """
+    if name in _caches:
+        raise ValueError(f"Cache {name} already exists")
+
+    _caches[name] = Cache(name)
+    return _caches[name]
+
+
+def configure(**sizes: int | None):
+    """
+    Set the maximum size of caches by name, for example:
+
+    `configure(segment_str=1024, ranges_iterable=None)`
+    """
+    unknown = set(sizes) - set(_caches)
+    if unknown:
+        raise ValueError(f"Unknown caches: {', '.join(sorted(unknown))}")
+
+    for name, maxsize in sizes.items():
+        _caches[name].resize(maxsize)
+
+
+def stats() -> dict[str, CacheInfo]:
+    """
+    Get the statistics for every cache
+    """
+    return {name: cache.info() for name, cache in _caches.items()}
+
+
+def clear():
+    """
+    Empty all the caches and reset their statistics
+    """
+    for cache in _caches.values():
+        cache.clear()
+
+
+def set_memo_limit(length: int):
+    """
+    Set the longest iterable that gets cached, see `MEMO_LIMIT`
+    """
+    global MEMO_LIMIT
+
+    if length < 0:
+        raise ValueError(f"Memo limit can't be negative ({length})")
+
+    MEMO_LIMIT = length
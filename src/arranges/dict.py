@@ -1,4 +1,9 @@
+from array import array
+
+from . import treap
 from .ranges import Ranges
+from .segment import format_bounds
+from .spanlist import SpanList
 from .utils import as_key, force_hash
 
 
@@ -11,9 +16,7 @@ class Dict:
     """
 
     def __init__(self, *args, **kwargs):
-        self._ranges = {}  # {range_key: hash_key} - rebuilt lazily when dirty
-        self._values = {}  # {hash_key: (actual_value, Ranges)}
-        self._dirty = False  # Flag to trigger rebuilding _ranges
+        self._reset()
 
         # Handle initialization like dict
         if args:
@@ -28,57 +31,40 @@ class Dict:
         range_ranges = as_key(key)
         hash_key = force_hash(value)
 
-        # Find existing ranges that intersect using query
-        matches = self._query(range_ranges)
-        affected_hashes = set(hash_key for _, hash_key in matches)
-
-        # Remove intersecting ranges from their values
-        for existing_hash_key in affected_hashes:
-            existing_value, existing_ranges = self._values[existing_hash_key]
-            remaining_ranges = existing_ranges - range_ranges
-            if remaining_ranges:
-                self._values[existing_hash_key] = (existing_value, remaining_ranges)
-            else:
-                del self._values[existing_hash_key]
-
-        # Add/update the new value's ranges
-        if hash_key in self._values:
-            # Value already exists, add to its ranges
-            old_value, old_ranges = self._values[hash_key]
-            new_ranges = old_ranges | range_ranges
-            self._values[hash_key] = (value, new_ranges)
-        else:
-            # New value
-            self._values[hash_key] = (value, range_ranges)
+        if not range_ranges:
+            return
 
-        self._dirty = True
+        # Overwrite each segment in place, keeping the newest equal value
+        self._values[hash_key] = value
+        for start, stop in zip(*range_ranges._bounds):
+            self._splice(start, stop, hash_key)
 
     def __getitem__(self, key):
         """Get value for a range or position: d[150] or d[100:200]"""
         query_ranges = as_key(key)
 
-        # Check if the query is completely covered by our ranges
-        if not query_ranges or query_ranges not in self.ranges:
-            raise KeyError(query_ranges)
+        hits = self._query(query_ranges)
 
-        matches = self._query(query_ranges)
+        # Check if the query is completely covered by the spans it hit
+        covered = Ranges._from_bounds(self._merged(hits))
+        if not query_ranges or query_ranges not in covered:
+            raise KeyError(query_ranges)
 
         # Check for ambiguous multi-value ranges - group by actual hash key
-        unique_hash_keys = set(hash_key for _, hash_key in matches)
+        unique_hash_keys = set(span[2] for span in hits)
         if len(unique_hash_keys) > 1:
             raise ValueError(
                 f"Range query {query_ranges} matched multiple different values"
             )
 
         # Return the (single) value
-        range_key, hash_key = matches[0]
-        return self._values[hash_key][0]
+        return self._values[hits[0][2]]
 
     def __contains__(self, key):
         """Check if a position/range is covered: 150 in d"""
         try:
             query_ranges = as_key(key)
-            return bool(self.ranges & query_ranges)
+            return bool(self._query(query_ranges))
         except ValueError:
             # Invalid range keys just don't exist
             return False
@@ -88,27 +74,16 @@ class Dict:
         delete_ranges = as_key(key)
 
         # Check if the key exists
-        if not delete_ranges or not (delete_ranges & self.ranges):
+        hits = self._query(delete_ranges)
+        if not hits:
             raise KeyError(delete_ranges)
 
-        matches = self._query(delete_ranges)
-
-        # Remove the deletion range from all intersecting values
-        affected_hashes = set(hash_key for _, hash_key in matches)
-        for hash_key in affected_hashes:
-            value, existing_ranges = self._values[hash_key]
-            remaining_ranges = existing_ranges - delete_ranges
-            if remaining_ranges:
-                self._values[hash_key] = (value, remaining_ranges)
-            else:
-                del self._values[hash_key]
-
-        self._dirty = True
+        for start, stop in zip(*delete_ranges._bounds):
+            self._splice(start, stop)
 
     def clear(self):
         """Clear all items and update ranges"""
-        self._ranges.clear()
-        self._values.clear()
+        self._reset()
 
     def pop(self, key, *args):
         """Pop a key and update ranges"""
@@ -123,11 +98,11 @@ class Dict:
 
     def popitem(self):
         """Pop an item and update ranges"""
-        self._update()
-        if not self._ranges:
+        if not self:
             raise KeyError("popitem(): dictionary is empty")
-        range_key = next(iter(self._ranges))
-        value = self._values[self._ranges[range_key]][0]
+        start, stop, hash_key = self._span(0)
+        range_key = format_bounds(start, stop)
+        value = self._values[hash_key]
         del self[range_key]
         return range_key, value
 
@@ -139,7 +114,9 @@ class Dict:
 
         if args:
             other = args[0]
-            if hasattr(other, "keys"):
+            if isinstance(other, Dict):
+                self._overlay(other)
+            elif hasattr(other, "keys"):
                 for k in other.keys():
                     self[k] = other[k]
             else:
@@ -185,45 +162,44 @@ class Dict:
         """Return a copy of this Dict"""
         new_dict = Dict()
         new_dict._values = self._values.copy()
-        new_dict._dirty = True  # Force rebuild on first access
+        new_dict._counts = self._counts.copy()
+        new_dict._index = self._index.copy()
         return new_dict
 
     def keys(self):
         """Return view of range keys"""
-        self._update()
-        return self._ranges.keys()
+        return [format_bounds(start, stop) for start, stop, _ in self._spans()]
 
     def values(self):
         """Return view of values"""
-        return (v[0] for v in self._values.values())
+        return iter(self._values.values())
 
     def items(self):
         """Return view of (range_key, value) pairs"""
-        self._update()
-        return ((k, self._values[v][0]) for k, v in self._ranges.items())
+        values = self._values
+        return ((format_bounds(s, e), values[k]) for s, e, k in self._spans())
 
     def __len__(self):
         """Return number of stored ranges"""
-        self._update()
-        return len(self._ranges)
+        return len(self._index)
 
     def __bool__(self):
         """Return True if not empty"""
-        return bool(self._values)
+        return bool(self._index)
 
     def __iter__(self):
         """Iterate over range keys"""
-        self._update()
-        return iter(self._ranges)
+        return iter(self.keys())
 
     def __reversed__(self):
         """Iterate over range keys in reverse order"""
-        self._update()
-        return reversed(list(self._ranges.keys()))
+        return reversed(self.keys())
 
     def __eq__(self, other):
         """Check equality with another dict"""
         try:
+            if isinstance(other, Dict):
+                return self._same_as(other)
             if len(self) != len(other):
                 return False
             for k, v in self.items():
@@ -236,42 +212,229 @@ class Dict:
     def __repr__(self):
         """String representation"""
         items = list(self.items())
-        return f"Dict({dict(items)})"
+        return f"{type(self).__name__}({dict(items)})"
+
+    def _splice(self, start, stop, hash_key=None):
+        """
+        Overwrite start:stop with a span of hash_key, or clear it if hash_key
+        is None, patching only the part of the index that it touches
+        """
+        # Spans that overlap or touch start:stop, so neighbours can merge
+        lo = self._bisect_left(start) - 1
+        if lo < 0 or self._span(lo)[1] < start:
+            lo += 1
+        hi = self._bisect_right(stop, lo)
+
+        # Keep the bits that hang off either end, with the new span between
+        pieces = []
+        if lo < hi:
+            first, last = self._span(lo), self._span(hi - 1)
+            if first[0] < start:
+                pieces.append((first[0], min(first[1], start), first[2]))
+        if hash_key is not None:
+            pieces.append((start, stop, hash_key))
+        if lo < hi and last[1] > stop:
+            pieces.append((max(last[0], stop), last[1], last[2]))
+
+        # Join touching pieces that hold the same value
+        merged = []
+        for piece in pieces:
+            if merged and merged[-1][2] == piece[2] and merged[-1][1] == piece[0]:
+                merged[-1] = (merged[-1][0], piece[1], piece[2])
+            else:
+                merged.append(piece)
+
+        removed = self._replace(lo, hi, merged)
+
+        # Forget values that no longer have any spans
+        for _, _, key in merged:
+            self._counts[key] = self._counts.get(key, 0) + 1
+        for key in removed:
+            self._counts[key] -= 1
+            if not self._counts[key]:
+                del self._counts[key]
+                del self._values[key]
+
+    def _overlay(self, other):
+        """
+        Write all of another Dict over this one in a single sweep, the same as
+        setting each of its keys in turn
+        """
+        spans = _overlay_spans(self._spans(), other._spans())
+
+        # Its values replace equal ones of ours, and new ones go on the end
+        values = self._values.copy()
+        for _, _, key in other._spans():
+            values[key] = other._values[key]
+
+        counts = {}
+        for _, _, key in spans:
+            counts[key] = counts.get(key, 0) + 1
+
+        self._reset()
+        self._replace(0, 0, spans)
+        for key, value in values.items():
+            if key in counts:
+                self._values[key] = value
+                self._counts[key] = counts[key]
+
+    def _same_as(self, other):
+        """True if another Dict has the same spans holding equal values"""
+        if len(self) != len(other):
+            return False
+        values, other_values = self._values, other._values
+        for mine, theirs in zip(self._spans(), other._spans()):
+            if mine[:2] != theirs[:2] or values[mine[2]] != other_values[theirs[2]]:
+                return False
+        return True
 
-    def _update(self):
-        """Rebuild _ranges if dirty"""
-        if not self._dirty:
-            return
+    def _query(self, query_ranges):
+        """The (start, stop, hash_key) spans that overlap a Ranges, in order"""
+        hits = []
+        after = 0  # index of the span after the last hit
+        for start, stop in zip(*query_ranges._bounds):
+            # The span before this start might reach into it
+            i = self._bisect_right(start) - 1
+            if i < 0 or self._span(i)[1] <= start:
+                i += 1
+            i = max(i, after)
+            for span in self._spans(i):
+                if span[0] >= stop:
+                    break
+                hits.append(span)
+                i += 1
+            after = i
+        return hits
+
+    def _merged(self, spans):
+        """Bounds of some spans in order, joined where they touch"""
+        starts, stops = array("q"), array("q")
+        for start, stop, _ in spans:
+            if stops and stops[-1] == start:
+                stops[-1] = stop
+            else:
+                starts.append(start)
+                stops.append(stop)
+        return starts, stops
 
-        # Rebuild algorithm: collect all segments by value
-        value_segments = {}  # hash_key -> [segments]
-        for hash_key, (value, ranges) in self._values.items():
-            value_segments[hash_key] = list(ranges.segments)
+    @property
+    def ranges(self):
+        """Union of all stored ranges (for compatibility)"""
+        return Ranges._from_bounds(self._merged(self._spans()))
 
-        # Rebuild _ranges from consolidated ranges
-        self._ranges.clear()
-        for hash_key, segments in value_segments.items():
-            if segments:
-                consolidated_ranges = Ranges(segments)
-                for segment in consolidated_ranges.segments:
-                    self._ranges[str(segment)] = hash_key
+    # The span index. Spans are (start, stop, hash_key) and kept in order of
+    # start; these are all the rest of the class needs from it.
 
-        self._dirty = False
+    def _reset(self):
+        """Forget everything"""
+        self._values = {}  # {hash_key: actual_value}
+        self._counts = {}  # {hash_key: number of spans holding it}
+        self._index = SpanList()  # spans in order of start
 
-    def _query(self, query_ranges):
-        """Find matching ranges for a Ranges object (private method)"""
-        self._update()  # Ensure we're up to date
+    def _bisect_left(self, value, lo=0):
+        """How many spans start before value"""
+        return self._index.bisect_left(value, lo)
 
-        matches = []
-        for range_key, hash_key in self._ranges.items():
-            if query_ranges & Ranges(range_key):
-                matches.append((range_key, hash_key))
-        return matches
+    def _bisect_right(self, value, lo=0):
+        """How many spans start at or before value"""
+        return self._index.bisect_right(value, lo)
 
-    @property
-    def ranges(self):
-        """Union of all stored ranges (for compatibility)"""
-        self._update()
-        if not self._ranges:
-            return Ranges("")
-        return Ranges(",".join(self._ranges.keys()))
+    def _span(self, i):
+        """The span at index i"""
+        return self._index.span(i)
+
+    def _spans(self, i=0):
+        """The spans in order, from index i"""
+        return self._index.spans(i)
+
+    def _replace(self, lo, hi, spans):
+        """Swap the spans from lo to hi for others, returning the old keys"""
+        return self._index.replace(lo, hi, spans)
+
+
+class PersistentDict(Dict):
+    """
+    A Dict that shares its structure with its copies.
+
+    Spans and the value tables are kept in persistent trees (see
+    arranges.treap), so copy() is O(1), each write builds O(log n) new nodes
+    and older copies carry on reading what they held.
+    """
+
+    def copy(self):
+        """Return a copy of this PersistentDict, sharing everything"""
+        new_dict = object.__new__(type(self))
+        new_dict._root = self._root
+        new_dict._values = self._values.copy()
+        new_dict._counts = self._counts.copy()
+        return new_dict
+
+    def __len__(self):
+        """Return number of stored ranges"""
+        return treap.size(self._root)
+
+    def __bool__(self):
+        """Return True if not empty"""
+        return self._root is not None
+
+    def _reset(self):
+        """Forget everything"""
+        self._values = treap.PersistentMap()
+        self._counts = treap.PersistentMap()
+        self._root = None  # treap of spans
+
+    def _bisect_left(self, value, lo=0):
+        """How many spans start before value"""
+        return max(treap.bisect_left(self._root, value), lo)
+
+    def _bisect_right(self, value, lo=0):
+        """How many spans start at or before value"""
+        return max(treap.bisect_right(self._root, value), lo)
+
+    def _span(self, i):
+        """The span at index i"""
+        return treap.at(self._root, i)
+
+    def _spans(self, i=0):
+        """The spans in order, from index i"""
+        return treap.spans(self._root, i)
+
+    def _replace(self, lo, hi, spans):
+        """Swap the spans from lo to hi for others, returning the old keys"""
+        self._root, removed = treap.splice(self._root, lo, hi, spans)
+        return [span[2] for span in removed]
+
+
+def _overlay_spans(below, above):
+    """
+    Lay one sorted list of (start, stop, hash_key) spans over another, joining
+    touching spans with the same key, in one pass over both
+    """
+    result = []
+
+    def add(start, stop, key):
+        if result and result[-1][1] == start and result[-1][2] == key:
+            result[-1] = (result[-1][0], stop, key)
+        else:
+            result.append((start, stop, key))
+
+    below = iter(below)
+    current = next(below, None)
+    for start, stop, key in above:
+        # Keep what's showing before this span, then drop what it hides
+        while current is not None and current[0] < start:
+            add(current[0], min(current[1], start), current[2])
+            if current[1] > start:
+                current = (start, current[1], current[2])
+                break
+            current = next(below, None)
+        add(start, stop, key)
+        while current is not None and current[1] <= stop:
+            current = next(below, None)
+        if current is not None and current[0] < stop:
+            current = (stop, current[1], current[2])
+
+    while current is not None:
+        add(*current)
+        current = next(below, None)
+    return result
@@ -0,0 +1,113 @@
+"""
+Reading the parts of a file that a Ranges selects, in as few system calls as
+possible.
+"""
+
+import mmap
+import os
+from typing import Any
+
+from arranges.ranges import Ranges
+
+PREADV = hasattr(os, "preadv")
+"""
+Whether the platform has `os.preadv`. Without it files are mapped instead.
+"""
+
+DEFAULT_MAX_GAP = 4096
+"""
+Segments this close together are read in one go, along with the gap between
+them. Reading a page we don't need is usually cheaper than another syscall.
+"""
+
+
+def _open(source: Any) -> tuple[int, bool]:
+    """
+    Get a file descriptor for a path, descriptor or file object, and whether
+    we opened it ourselves
+    """
+    if isinstance(source, int):
+        return source, False
+    if hasattr(source, "fileno"):
+        return source.fileno(), False
+    return os.open(source, os.O_RDONLY), True
+
+
+def _fill(fd: int, buffer: bytearray, offset: int):
+    """
+    Read into the whole of buffer from offset, carrying on after short reads
+    """
+    view = memoryview(buffer)
+    pos = 0
+    while pos < len(buffer):
+        count = os.preadv(fd, [view[pos:]], offset + pos)
+        if not count:
+            raise EOFError(f"File ended at {offset + pos} while reading")
+        pos += count
+
+
+def _read_preadv(fd: int, ranges: Ranges, size: int, max_gap: int) -> list:
+    """
+    Coalesce segments that are close together into blocks, read each block
+    with one preadv and slice the segments out of it.
+    """
+    spans = ranges & Ranges(0, size)
+    blocks = spans.coalesce(max_gap)
+    segments = zip(*spans._bounds)
+
+    views = []
+    for block_start, block_stop in zip(*blocks._bounds):
+        buffer = bytearray(block_stop - block_start)
+        _fill(fd, buffer, block_start)
+        block = memoryview(buffer)
+
+        # every segment sits inside exactly one block, in the same order
+        for start, stop in segments:
+            views.append(block[start - block_start : stop - block_start])
+            if stop == block_stop:
+                break
+    return views
+
+
+def _read_mmap(fd: int, ranges: Ranges, size: int) -> list:
+    """
+    Map the file and slice the segments out of the map
+    """
+    if not size:
+        return []
+    return ranges.take(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+
+
+def read_ranges(
+    source: Any,
+    ranges: Any,
+    max_gap: int = DEFAULT_MAX_GAP,
+    use_mmap: bool = False,
+) -> list[memoryview]:
+    """
+    Read the bytes that ranges selects from a file, given as a path, a file
+    descriptor or an open file object.
+
+    Segments that are within max_gap bytes of each other are read together
+    with a single os.preadv, and each one gets a memoryview into the block
+    it was read in, so nothing is copied twice. With use_mmap=True, or if
+    the platform doesn't have preadv, the file is mapped and the views point
+    into the map instead.
+
+    You get one view per segment, and anything past the end of the file is
+    left out, the same as Ranges.take(). Segments that touch or overlap are
+    merged when ranges is made into a Ranges, so they come back as one view.
+    """
+    if max_gap < 0:
+        raise ValueError(f"max_gap can't be negative ({max_gap})")
+
+    ranges = Ranges(ranges)
+    fd, opened = _open(source)
+    try:
+        size = os.fstat(fd).st_size
+        if use_mmap or not PREADV:
+            return _read_mmap(fd, ranges, size)
+        return _read_preadv(fd, ranges, size, max_gap)
+    finally:
+        if opened:
+            os.close(fd)
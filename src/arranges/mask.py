@@ -0,0 +1,148 @@
+"""
+Conversion between bounds and masks, either one bool per value or packed
+eight to a byte with the first value in the highest bit, like
+`numpy.packbits`.
+"""
+
+from array import array
+from typing import Any
+
+try:
+    import numpy as np
+
+    NUMPY = True
+except ImportError:
+    NUMPY = False
+
+PACKED = (bytes, bytearray, memoryview)
+"""
+Types that are read as packed bits rather than one value per item
+"""
+
+
+def _edges(mask) -> tuple[array, array]:
+    """
+    Find the starts and stops of runs in a numpy bool array
+    """
+    padded = np.zeros(len(mask) + 2, dtype=np.int8)
+    padded[1:-1] = mask
+    change = np.diff(padded)
+    starts = np.flatnonzero(change == 1).astype(np.int64)
+    stops = np.flatnonzero(change == -1).astype(np.int64)
+    return array("q", starts.tobytes()), array("q", stops.tobytes())
+
+
+def _scan_bits(data: bytes) -> tuple[array, array]:
+    """
+    Find runs in packed bits without numpy, skipping over whole bytes of
+    zeros or ones.
+    """
+    starts, stops = array("q"), array("q")
+    inside = False
+
+    for i, byte in enumerate(data):
+        if byte == 0 or byte == 0xFF:
+            if inside != (byte == 0xFF):
+                (starts if byte else stops).append(i * 8)
+                inside = not inside
+            continue
+
+        for bit in range(8):
+            if inside != bool(byte & (0x80 >> bit)):
+                (stops if inside else starts).append(i * 8 + bit)
+                inside = not inside
+
+    if inside:
+        stops.append(len(data) * 8)
+    return starts, stops
+
+
+def _scan_items(mask) -> tuple[array, array]:
+    """
+    Find runs of truthy items without numpy
+    """
+    starts, stops = array("q"), array("q")
+    inside = False
+    length = 0
+
+    for length, value in enumerate(mask, 1):
+        if inside != bool(value):
+            (stops if inside else starts).append(length - 1)
+            inside = not inside
+
+    if inside:
+        stops.append(length)
+    return starts, stops
+
+
+def mask_to_bounds(mask: Any) -> tuple[array, array]:
+    """
+    Find the runs of set values in a mask. bytes, bytearray and memoryview
+    are packed bits, anything else has one truthy or falsy item per value.
+    """
+    if isinstance(mask, PACKED):
+        if not NUMPY:
+            return _scan_bits(bytes(mask))
+        mask = np.unpackbits(np.frombuffer(mask, dtype=np.uint8))
+
+    if not NUMPY:
+        return _scan_items(mask)
+
+    mask = np.asarray(mask)
+    if mask.ndim != 1:
+        raise TypeError(f"Expected a 1-D mask, not {mask.ndim}-D")
+    return _edges(mask.astype(bool, copy=False))
+
+
+def _fill_bits(buffer: bytearray, start: int, stop: int):
+    """
+    Set the bits from start up to stop in a packed buffer
+    """
+    first, last = start >> 3, (stop - 1) >> 3
+    head = 0xFF >> (start & 7)
+    tail = (0xFF << (7 - ((stop - 1) & 7))) & 0xFF
+
+    if first == last:
+        buffer[first] |= head & tail
+        return
+
+    buffer[first] |= head
+    buffer[first + 1 : last] = b"\xff" * (last - first - 1)
+    buffer[last] |= tail
+
+
+def bounds_to_mask(
+    starts: array, stops: array, length: int, packed: bool = False
+) -> Any:
+    """
+    Make a mask of length values with the bounds set, cutting off anything
+    past the end.
+
+    Packed masks are a bytearray. Otherwise it's a numpy bool array, or a
+    list of bools if numpy isn't available.
+    """
+    if length < 0:
+        raise ValueError(f"Mask length can't be negative ({length})")
+
+    spans = [
+        (start, min(stop, length))
+        for start, stop in zip(starts, stops)
+        if start < length
+    ]
+
+    if packed:
+        buffer = bytearray((length + 7) >> 3)
+        for start, stop in spans:
+            _fill_bits(buffer, start, stop)
+        return buffer
+
+    if not NUMPY:
+        mask = [False] * length
+        for start, stop in spans:
+            mask[start:stop] = [True] * (stop - start)
+        return mask
+
+    mask = np.zeros(length, dtype=bool)
+    for start, stop in spans:
+        mask[start:stop] = True
+    return mask
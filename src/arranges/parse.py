@@ -0,0 +1,231 @@
+"""
+A single-pass parser for range strings, which reads straight into start and
+stop integers without making any Segments along the way.
+"""
+
+import re
+from array import array
+
+from arranges.utils import inf
+
+_TOKEN = r"0[xX][0-9a-fA-F_]+|0[oO][0-7_]+|0[bB][01_]+|\+?[0-9][0-9_]*|inf|end|start"
+_SEGMENT = (
+    rf"\s*(?P<start>{_TOKEN})?\s*"
+    rf"(?:(?P<sep>[:-])\s*(?P<stop>{_TOKEN})?\s*)?"
+)
+_ITEM = _SEGMENT + r"(?P<delim>[,;]|\Z)"
+_SEGMENT_STR = re.compile(_SEGMENT)
+_ITEM_STR = re.compile(_ITEM)
+_ITEM_BYTES = re.compile(_ITEM.encode())
+
+_NUMBER = r"[1-9][0-9]*"
+_CANONICAL = re.compile(
+    rf"(?:(?P<single>{_NUMBER}|0)|(?P<start>{_NUMBER})?:(?P<stop>{_NUMBER})?)(?P<delim>,|\Z)"
+)
+
+_HTTP_RANGE = re.compile(r"\s*([0-9]*)\s*-\s*([0-9]*)\s*")
+
+_KEYWORDS = {"inf": inf, "end": inf, "start": 0}
+_KEYWORDS.update({k.encode(): v for k, v in _KEYWORDS.items()})
+_PREFIXES = {"x", "X", "o", "O", "b", "B"}
+_PREFIXES.update({p.encode() for p in _PREFIXES})
+
+
+def _to_int(token, default):
+    """
+    Convert a token matched by the parser to an int
+    """
+    if not token:
+        return default
+    if token in _KEYWORDS:
+        return _KEYWORDS[token]
+    if token[1:2] in _PREFIXES:
+        return int(token, 0)
+    return int(token)
+
+
+def _bounds(match: re.Match) -> tuple[int, int]:
+    """
+    Get the start and stop from a matched segment, with inf for no end
+    """
+    start_token, sep, stop_token = match.group("start", "sep", "stop")
+    if sep:
+        start, stop = _to_int(start_token, 0), _to_int(stop_token, inf)
+    elif start_token:
+        start = _to_int(start_token, 0)
+        stop = start + 1
+    else:
+        start = stop = 0
+
+    if start > stop:
+        raise ValueError(f"Stop ({stop}) can't be before start ({start})")
+    if start > inf.huge or (stop != inf and stop > inf.huge):
+        raise ValueError("Can't have a range with values past sys.maxsize")
+
+    return start, stop
+
+
+def _invalid(text, pos: int) -> ValueError:
+    """
+    Error for text that couldn't be parsed
+    """
+    shown = text if isinstance(text, str) else bytes(text)
+    return ValueError(f"Invalid integer value at position {pos} of {shown!r}")
+
+
+def parse_segment(text: str) -> tuple[int, int]:
+    """
+    Parse a single segment like "1:10" into its start and stop, with inf for
+    no end and (0, 0) for an empty string.
+    """
+    match = _SEGMENT_STR.fullmatch(text)
+    if not match:
+        raise _invalid(text, _SEGMENT_STR.match(text).end())
+    return _bounds(match)
+
+
+def iter_pairs(text: str | bytes | memoryview):
+    """
+    Scan a range string once, yielding a (start, stop) pair for each
+    non-empty comma or semicolon separated part, in the order they appear.
+
+    Accepts bytes-like input too, which is scanned without decoding it.
+    """
+    item = _ITEM_STR if isinstance(text, str) else _ITEM_BYTES
+    pos = 0
+
+    while True:
+        match = item.match(text, pos)
+        if not match:
+            raise _invalid(text, pos)
+
+        start, stop = _bounds(match)
+        if start < stop:
+            yield start, inf.huge if stop == inf else stop
+
+        if not match.group("delim"):
+            return
+        pos = match.end()
+
+
+def parse_canonical(text: str) -> tuple[array, array] | None:
+    """
+    Read a string that's already in canonical form, like the ones Ranges
+    produce, in one scan. Returns None if it isn't canonical, so the caller
+    can fall back to parse_bounds().
+    """
+    starts, stops = array("q"), array("q")
+    if not text[:1]:
+        return starts, stops
+
+    pos = 0
+    last = -1
+    while True:
+        match = _CANONICAL.match(text, pos)
+        if not match:
+            return None
+
+        single, start, stop, delim = match.groups()
+        if single:
+            start = int(single)
+            stop = start + 1
+        else:
+            start = int(start) if start else 0
+            # a stop written out as huge or more isn't how no stop looks
+            stop = int(stop) if stop else None
+            if stop is None:
+                stop = inf.huge
+            elif stop >= inf.huge:
+                return None
+            if stop <= start + 1:
+                return None
+
+        if start >= inf.huge:
+            return None
+
+        # must be sorted and not touching the last one
+        if start <= last:
+            return None
+        starts.append(start)
+        stops.append(stop)
+        last = stop
+
+        if not delim:
+            return starts, stops
+        pos = match.end()
+
+
+def merge_pairs(pairs: list[tuple[int, int]]) -> tuple[array, array]:
+    """
+    Sort and merge (start, stop) pairs into start and stop arrays, skipping
+    the sort if they're already in order.
+    """
+    if any(pairs[i] > pairs[i + 1] for i in range(len(pairs) - 1)):
+        pairs.sort()
+
+    starts, stops = array("q"), array("q")
+    for start, stop in pairs:
+        if stops and start <= stops[-1]:
+            stops[-1] = max(stops[-1], stop)
+        else:
+            starts.append(start)
+            stops.append(stop)
+    return starts, stops
+
+
+def parse_bounds(text: str | bytes | memoryview) -> tuple[array, array]:
+    """
+    Parse a range string into sorted, merged start and stop arrays
+    """
+    return merge_pairs(list(iter_pairs(text)))
+
+
+def parse_http_range(
+    header: str, length: int | None, max_segments: int
+) -> tuple[array, array]:
+    """
+    Parse an HTTP Range header like "bytes=0-99,200-,-500" into merged
+    bounds, resolving suffix ranges and cutting things off at the length of
+    the content. A length of None means it's unknown, so suffix ranges can't
+    be used.
+
+    Raises ValueError if the header is malformed, has more than
+    max_segments ranges in it, or none of them are satisfiable.
+    """
+    unit, eq, spec = header.partition("=")
+    if not eq or unit.strip().lower() != "bytes":
+        raise ValueError(f"Not a bytes range: {header!r}")
+
+    parts = spec.split(",", max_segments)
+    if len(parts) > max_segments:
+        raise ValueError(f"More than {max_segments} ranges requested")
+
+    end = inf.huge if length is None else length
+    pairs = []
+    for part in parts:
+        match = _HTTP_RANGE.fullmatch(part)
+        if not match:
+            if part.strip():
+                raise ValueError(f"Invalid byte range: {part!r}")
+            continue
+
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            stop = min(int(last) + 1, end) if last else end
+            if last and int(last) < start:
+                raise ValueError(f"Invalid byte range: {part!r}")
+        elif last:
+            if length is None:
+                raise ValueError("Can't use a suffix range without a length")
+            start, stop = max(length - int(last), 0), length
+        else:
+            raise ValueError(f"Invalid byte range: {part!r}")
+
+        if start < stop:
+            pairs.append((start, stop))
+
+    if not pairs:
+        raise ValueError(f"Range not satisfiable: {header!r}")
+
+    return merge_pairs(pairs)
@@ -1,6 +1,9 @@
+import operator
 import re
-from functools import lru_cache
-from typing import Any, Iterable
+from array import array
+from bisect import bisect_right
+from itertools import chain
+from typing import Any, Iterable, Iterator
 
 try:
     from pydantic import GetCoreSchemaHandler
@@ -10,22 +13,150 @@ try:
 except ImportError:
     PYDANTIC = False
 
-from arranges.segment import Segment, range_idx
+try:
+    import numpy as np
+
+    NUMPY = True
+except ImportError:
+    NUMPY = False
+
+from arranges import cache
+from arranges.bitmap import Bitmap, chunk_bits, chunk_bounds, is_dense, pack
+from arranges.binary import decode_bounds, encode_bounds
+from arranges.cache import cached
+from arranges.mask import bounds_to_mask, mask_to_bounds
+from arranges.parse import (
+    iter_pairs,
+    merge_pairs,
+    parse_bounds,
+    parse_canonical,
+    parse_http_range,
+)
+from arranges.segment import Segment, fix_start_stop, format_bounds, range_idx
+from arranges.sweep import (
+    Bounds,
+    coalesce,
+    complement,
+    intersect,
+    overlaps,
+    subtract,
+    union,
+)
 from arranges.utils import inf, is_intlike, is_iterable, is_rangelike, try_hash
 
 
+Store = Bounds | Bitmap
+"""
+How a Ranges keeps its bounds: as they are, or in a Bitmap when that's
+smaller. See `arranges.bitmap`.
+"""
+
+
+def _stop(value: int) -> range_idx:
+    """
+    Unpack a stored stop value, turning the sentinel back into inf
+    """
+    return inf if value >= inf.huge else value
+
+
+def _bounds_to_str(starts: array, stops: array) -> str:
+    """
+    Format bounds as a canonical string without creating any segments
+    """
+    return ",".join(map(format_bounds, starts, stops))
+
+
+def _runs(values: memoryview, assume_sorted: bool) -> Bounds:
+    """
+    Find runs of consecutive values in a buffer of integers, for when numpy
+    isn't available.
+    """
+    if values.ndim != 1 or values.format.lstrip("@=<>!") not in "bBhHiIlLqQnN":
+        raise TypeError(f"Expected a 1-D buffer of integers, not {values.format}")
+
+    values = values.tolist()
+    if not assume_sorted and any(a > b for a, b in zip(values, values[1:])):
+        values.sort()
+
+    starts, stops = array("q"), array("q")
+    if not values:
+        return starts, stops
+
+    if values[0] < 0:
+        raise ValueError("Can't have a range with negative values")
+    if values[-1] >= inf.huge:
+        raise ValueError(f"{values[-1]} is too big for a range")
+
+    for value in values:
+        if stops and value <= stops[-1]:
+            if value == stops[-1]:
+                stops[-1] += 1
+        else:
+            starts.append(value)
+            stops.append(value + 1)
+    return starts, stops
+
+
+def _and_not(a: int, b: int) -> int:
+    """
+    Bits in a that aren't in b
+    """
+    return a & ~b
+
+
+def _covers(a: Bounds, start: int, stop: int) -> bool:
+    """
+    True if start:stop sits entirely inside one of the spans in a, found by
+    bisecting the starts.
+    """
+    starts, stops = a
+    i = bisect_right(starts, start) - 1
+    return i >= 0 and (stop <= stops[i] or stops[i] >= inf.huge)
+
+
+def _combine(a: Store, b: Store, bounds_op, bits_op) -> Store:
+    """
+    Apply a set operation to two stores where at least one is a Bitmap.
+
+    Chunks that either side has a bitmap for are done with bits_op on ints,
+    and the runs outside of them with bounds_op.
+    """
+    keys = sorted(getattr(a, "chunks", {}).keys() | getattr(b, "chunks", {}).keys())
+    area = chunk_bounds(keys)
+
+    chunks = {}
+    for key in keys:
+        bits = bits_op(chunk_bits(a, key), chunk_bits(b, key))
+        if bits:
+            chunks[key] = bits
+
+    outside = [subtract(getattr(x, "runs", x), area) for x in (a, b)]
+    runs = bounds_op(*outside)
+
+    store = Bitmap(chunks, runs)
+    if not chunks or not all(map(is_dense, chunks.values())):
+        return pack(store.bounds())
+    return store
+
+
 class Ranges(str):
     """
     A range set that can be hashed and converted to a string.
+
+    The boundaries are kept in a pair of packed int64 arrays, and the
+    `Segment` objects are only created if someone asks for them.
     """
 
-    segments: tuple[Segment]
+    _store: Store
 
     def __init__(self, value: Any, stop: range_idx | None = None):
         """
-        Construct a new string with the canonical form of the range.
+        Fill in the bounds from the canonical string, unless __new__ already
+        knew them.
         """
-        self.segments = self.from_str(self)
+        if not hasattr(self, "_store"):
+            text = str(self)
+            self._bounds = parse_canonical(text) or parse_bounds(text)
 
     def __new__(cls, value: Any, stop: range_idx | None = None) -> str:
         """
@@ -33,6 +164,32 @@ class Ranges(str):
 
         This becomes "self" in __init__, so we're always a string
         """
+        if stop is None and isinstance(value, str):
+            if isinstance(value, Ranges):
+                ret = str.__new__(cls, value)
+                ret._store = value._store
+                if hasattr(value, "_unpacked"):
+                    ret._unpacked = value._unpacked
+                return ret
+
+            # Strings that are already canonical are only read once
+            bounds = parse_canonical(value)
+            if bounds is not None:
+                ret = str.__new__(cls, value)
+                ret._bounds = bounds
+                return ret
+
+            return cls._from_bounds(parse_bounds(value))
+
+        if NUMPY and stop is None and isinstance(value, np.ndarray):
+            if value.ndim == 1 and value.dtype.kind in "iu":
+                return cls.from_array(value)
+
+        # Iterables are merged into bounds, so there's nothing to read back
+        if stop is None and is_iterable(value) and not is_intlike(value):
+            if not is_rangelike(value) and not hasattr(value, "segments"):
+                return cls._from_bounds(cls._iterable_bounds(value))
+
         val = cls.construct_str(value, stop)
         return str.__new__(cls, val)
 
@@ -62,52 +219,217 @@ class Ranges(str):
                     f"Use discrete ranges like '0,2,4,6,8' instead."
                 )
 
+        if isinstance(value, Ranges):
+            return str(value)
+
         if hasattr(value, "segments"):
             return ",".join(value.segments)
 
         if isinstance(value, str):
-            normalized = cls.from_str(value)
-            return ",".join(str(v) for v in normalized)
+            return _bounds_to_str(*parse_bounds(value))
 
         if is_iterable(value):
             return cls.iterable_to_str(value)
 
         raise TypeError(f"Cannot convert {value} into {cls.__name__}")
 
+    @classmethod
+    def _from_bounds(cls, bounds: Bounds) -> "Ranges":
+        """
+        Construct directly from packed bounds without parsing anything.
+        Internal use only, the input isn't checked.
+        """
+        ret = str.__new__(cls, _bounds_to_str(*bounds))
+        ret._bounds = bounds
+        return ret
+
+    @classmethod
+    def _from_store(cls, store: Store) -> "Ranges":
+        """
+        Construct from bounds that are already packed. Internal use only.
+        """
+        bounds = store if type(store) is tuple else store.bounds()
+        ret = str.__new__(cls, _bounds_to_str(*bounds))
+        ret._store = store
+        return ret
+
+    def _apply(self, other: "Ranges", bounds_op, bits_op) -> "Ranges":
+        """
+        Apply a set operation, on bitmaps where we can
+        """
+        if type(self._store) is tuple and type(other._store) is tuple:
+            return self._from_bounds(bounds_op(self._bounds, other._bounds))
+        return self._from_store(_combine(self._store, other._store, bounds_op, bits_op))
+
+    @property
+    def _bounds(self) -> Bounds:
+        """
+        Our bounds, unpacked from a Bitmap the first time they're needed if
+        that's how they're stored
+        """
+        store = self._store
+        if type(store) is tuple:
+            return store
+        try:
+            return self._unpacked
+        except AttributeError:
+            self._unpacked = store.bounds()
+            return self._unpacked
+
+    @_bounds.setter
+    def _bounds(self, bounds: Bounds):
+        self._store = pack(bounds)
+
+    @property
+    def segments(self) -> tuple[Segment]:
+        """
+        The segments in this range, created on first access.
+        """
+        try:
+            return self._segments
+        except AttributeError:
+            starts, stops = self._bounds
+            segments = tuple(map(Segment._from_bounds, starts, map(_stop, stops)))
+            self._segments = segments or (Segment._from_bounds(0, 0),)
+            return self._segments
+
     @staticmethod
     def split_str(value: str) -> list[str]:
         return re.split(r",|;", value)
 
     @classmethod
-    def from_str(cls, value: str) -> tuple[Segment]:
+    def from_str(cls, value: str | bytes | memoryview) -> tuple[Segment]:
         """
         Construct from a string.
         """
-        ret = []
+        return cls.parse(value).segments
 
-        for s in cls.split_str(value):
-            ret.append(Segment.from_str(s))
+    @classmethod
+    def parse(cls, value: str | bytes | memoryview) -> "Ranges":
+        """
+        Parse a range string in a single pass. Bytes-like objects are read
+        without being decoded first.
+        """
+        if isinstance(value, str):
+            return cls(value)
+        return cls._from_bounds(parse_bounds(value))
+
+    @classmethod
+    def from_array(cls, values: Any, assume_sorted: bool = False) -> "Ranges":
+        """
+        Construct from a 1-D array of integers, like a numpy array or anything
+        else that supports the buffer protocol, by finding runs of
+        consecutive values.
+
+        With numpy this is done with a vectorised diff, so no Python ints are
+        made for the elements. Without it the buffer is read in a loop. Pass
+        assume_sorted=True to skip checking the order if you know it's sorted,
+        you'll get nonsense back if it isn't.
+        """
+        if not NUMPY:
+            return cls._from_bounds(_runs(memoryview(values), assume_sorted))
+
+        if not isinstance(values, np.ndarray):
+            values = np.asarray(memoryview(values))
+
+        if values.ndim != 1 or values.dtype.kind not in "iu":
+            raise TypeError(f"Expected a 1-D array of integers, not {values.dtype}")
+
+        if not values.size:
+            return cls._from_bounds((array("q"), array("q")))
 
-        cacheable = tuple(set(ret))
+        if not assume_sorted and (values[1:] < values[:-1]).any():
+            values = np.sort(values)
 
-        return cls.from_hashable_iterable(cacheable)
+        if values[0] < 0:
+            raise ValueError("Can't have a range with negative values")
+        if values[-1] >= inf.huge:
+            raise ValueError(f"{values[-1]} is too big for a range")
+
+        values = values.astype(np.int64, copy=False)
+        breaks = np.flatnonzero(np.diff(values) > 1)
+        starts = np.concatenate((values[:1], values[breaks + 1]))
+        stops = np.concatenate((values[breaks], values[-1:])) + 1
+
+        return cls._from_bounds(
+            (array("q", starts.tobytes()), array("q", stops.tobytes()))
+        )
+
+    @classmethod
+    def from_mask(cls, mask: Any) -> "Ranges":
+        """
+        Construct from a mask where set values are in the range. bytes,
+        bytearray and memoryview are read as packed bits with the first
+        value in the highest bit, like numpy.packbits. Anything else, like a
+        numpy bool array, has one item per value.
+        """
+        return cls._from_bounds(mask_to_bounds(mask))
+
+    @classmethod
+    def from_http_range(
+        cls, header: str, length: int | None = None, max_segments: int = 100
+    ) -> "Ranges":
+        """
+        Construct from an HTTP Range header like "bytes=0-99,200-,-500".
+
+        Suffix ranges are resolved and everything is cut off at length, the
+        size of the content, which has to be given if there are suffixes.
+        Headers with more than max_segments ranges are refused, so a client
+        can't make us do lots of work. Raises ValueError if the header is
+        malformed or nothing in it is satisfiable.
+        """
+        return cls._from_bounds(parse_http_range(header, length, max_segments))
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview) -> "Ranges":
+        """
+        Construct from the binary form made by to_bytes()
+        """
+        return cls._from_bounds(decode_bounds(data))
 
     @classmethod
     def iterable_to_str(cls, iterable: Iterable) -> str:
         """
         Convert an iterable of ranges to a string
         """
+        return _bounds_to_str(*cls._iterable_bounds(iterable))
+
+    @classmethod
+    def _iterable_bounds(cls, iterable: Iterable) -> Bounds:
+        """
+        Merge an iterable of ranges into bounds, through the cache if it's
+        small enough to keep
+        """
+        if not hasattr(iterable, "__len__") or len(iterable) > cache.MEMO_LIMIT:
+            return cls._stream_bounds(iterable)
+
         hashable = tuple(iterable)
         # contents might not be hashable
-        if try_hash(hashable):
-            vals = cls.from_hashable_iterable(hashable)
-        else:
-            vals = cls.from_iterable(hashable)
+        if not try_hash(hashable):
+            return merge_pairs(list(cls._flatten(hashable)))
 
-        return ",".join(str(v) for v in vals)
+        segments = cls.from_hashable_iterable(hashable)
+        starts = array("q", [seg.start for seg in segments])
+        stops = array(
+            "q", [inf.huge if seg.stop is inf else seg.stop for seg in segments]
+        )
+        return starts, stops
 
     @classmethod
-    @lru_cache
+    def _stream_bounds(cls, iterable: Iterable) -> Bounds:
+        """
+        Merge an iterable as it's read, using memory for the result rather
+        than the input.
+        """
+        # circular :(
+        from arranges.builder import RangesBuilder
+
+        builder = RangesBuilder()
+        builder.add_pairs(cls._flatten(iterable))
+        return builder.bounds()
+
+    @classmethod
+    @cached("ranges_iterable")
     def from_hashable_iterable(cls, value: tuple[Any]) -> tuple[Segment]:
         """
         Cache the result of from_iterable
@@ -115,46 +437,43 @@ class Ranges(str):
         return cls.from_iterable(value)
 
     @staticmethod
-    def _flatten(iterable: Iterable) -> Iterable[Segment]:
+    def _flatten(iterable: Iterable) -> Iterable[tuple[int, int]]:
         """
-        Flatten into RangeSegments
+        Flatten into (start, stop) pairs, with inf.huge for no end. Empty
+        parts are skipped.
         """
         for item in iterable:
-            if isinstance(item, Segment):
-                yield item
-            if isinstance(item, Ranges):
-                yield from item.segments
+            if type(item) is int:
+                yield fix_start_stop(item, item + 1)
+            elif isinstance(item, Segment):
+                if item:
+                    yield item.start, min(item.stop, inf.huge)
+            elif isinstance(item, Ranges):
+                yield from zip(*item._bounds)
             elif isinstance(item, str):
                 if item:
-                    yield from [Segment.from_str(s) for s in Ranges.split_str(item)]
+                    yield from iter_pairs(item)
+            elif isinstance(item, range) and item.step == 1:
+                # same values as iterating it, without visiting each one
+                if item:
+                    start, stop = fix_start_stop(item.start, item.stop)
+                    yield start, min(stop, inf.huge)
             elif is_iterable(item):
                 yield from Ranges._flatten(item)
             elif is_intlike(item):
-                yield Segment(item, item + 1)
+                start, stop = fix_start_stop(item, item + 1)
+                if start != stop:
+                    yield start, stop
             else:
-                yield from Ranges(item).segments
+                yield from zip(*Ranges(item)._bounds)
 
     @classmethod
     def from_iterable(cls, iterable: Iterable) -> tuple[Segment]:
         """
         Sort and merge a list of ranges.
         """
-        segments: list[Segment] = []
-        segments.extend(cls._flatten(iterable))
-        segments.sort(key=Segment.sort_key)
-
-        i = 1
-
-        while i < len(segments):
-            current = segments[i]
-            last = segments[i - 1]
-            if last.isconnected(current):
-                segments[i - 1] = current | last
-                del segments[i]
-                i -= 1
-            i += 1
-
-        return tuple(segments)
+        starts, stops = merge_pairs(list(cls._flatten(iterable)))
+        return tuple(map(Segment._from_bounds, starts, map(_stop, stops)))
 
     def __hash__(self):
         """
@@ -166,17 +485,25 @@ class Ranges(str):
         """
         Get the total length of all ranges
         """
-        return sum(len(segment) for segment in self.segments)
+        if type(self._store) is Bitmap:
+            return self._store.count()
+
+        total = 0
+        for start, stop in zip(*self._bounds):
+            total += inf.huge if stop >= inf.huge else stop - start
+        return total
 
     def __bool__(self) -> bool:
         """
         True if this range has any elements
         """
-        return any(bool(segment) for segment in self.segments)
+        store = self._store
+        return type(store) is Bitmap or bool(store[0])
 
     def __add__(self, other):
-        s = self.iterable_to_str((self, other))
-        return Ranges(s)
+        if not isinstance(other, Ranges):
+            other = Ranges((other,))
+        return self._apply(other, union, operator.or_)
 
     def __eq__(self, other: Any) -> bool:
         """
@@ -188,7 +515,10 @@ class Ranges(str):
             # todo: break _flatten out and separate internal and external
             # constructors,
             try:
-                other = Ranges((other,))
+                if isinstance(other, str):
+                    other = Ranges(other)
+                else:
+                    other = Ranges((other,))
             except (ValueError, TypeError):
                 return NotImplemented
         return super().__eq__(other)
@@ -206,39 +536,162 @@ class Ranges(str):
         """
         Are all of the other ranges in our ranges?
         """
+        if not self:
+            return False
+
+        if is_intlike(other) and not isinstance(other, float):
+            if type(self._store) is Bitmap:
+                return other >= 0 and self._store.covers(int(other))
+            return _covers(self._bounds, int(other), int(other) + 1)
+
         try:
-            combined = str(self + other)
-            return self and (combined == self)
+            if not isinstance(other, Ranges):
+                other = Ranges((other,))
         except (ValueError, TypeError):
             return False
 
+        bounds = self._bounds
+        return all(_covers(bounds, *span) for span in zip(*other._bounds))
+
+    def contains_many(self, values: Iterable[int]) -> Any:
+        """
+        Check lots of integers at once, returning a mask of which ones are in
+        our ranges.
+
+        With numpy this is a single searchsorted over our starts and the mask
+        is a bool array. Without it, each value is bisected in turn and you
+        get a list of bools back.
+        """
+        bounds = self._bounds
+        starts, stops = bounds
+
+        if not NUMPY:
+            return [_covers(bounds, v, v + 1) for v in values]
+
+        if not hasattr(values, "__len__"):
+            values = list(values)
+        values = np.asarray(values)
+        if not starts:
+            return np.zeros(values.shape, dtype=bool)
+
+        stops = np.frombuffer(stops, dtype=np.int64)
+        idx = np.searchsorted(np.frombuffer(starts, dtype=np.int64), values, "right")
+        idx -= 1
+        found = stops[idx]
+        return (idx >= 0) & ((values < found) | (found >= inf.huge))
+
+    def to_mask(self, length: int, packed: bool = False) -> Any:
+        """
+        Make a mask of the first length values, with ours set.
+
+        This is a numpy bool array, or a list of bools without numpy. If
+        packed is True you get a bytearray with eight values to a byte
+        instead, the same layout from_mask() reads.
+        """
+        return bounds_to_mask(*self._bounds, length, packed)
+
+    def take(self, buffer: Any) -> list:
+        """
+        Get the parts of a buffer that we select, without copying them.
+
+        Works with anything that supports the buffer protocol, like bytes,
+        bytearray or mmap, and gives a list of memoryview slices. Numpy
+        arrays are sliced along axis 0 and give a list of views instead.
+        Anything past the end of the buffer is left out.
+        """
+        if not (NUMPY and isinstance(buffer, np.ndarray)):
+            buffer = memoryview(buffer)
+
+        length = len(buffer)
+        views = []
+        for start, stop in zip(*self._bounds):
+            if start >= length:
+                break
+            views.append(buffer[start : min(stop, length)])
+        return views
+
+    def take_into(self, buffer: Any, out: Any) -> int:
+        """
+        Copy the parts of a buffer that we select into out, one after the
+        other, and return how many items were copied. out can be a writable
+        buffer or a numpy array, and needs to be big enough to hold them.
+        """
+        views = self.take(buffer)
+        if not (NUMPY and isinstance(out, np.ndarray)):
+            out = memoryview(out)
+
+        total = sum(len(view) for view in views)
+        if total > len(out):
+            raise ValueError(f"Output is too small ({len(out)} < {total})")
+
+        pos = 0
+        for view in views:
+            out[pos : pos + len(view)] = view
+            pos += len(view)
+        return pos
+
     def __iter__(self):
         """
         Iterate over the values in our ranges.
 
         Note that this could be boundless.
         """
-        for r in self.segments:
-            for i in r:
-                yield i
+        return chain.from_iterable(map(iter, self.segments))
+
+    def iter_ranges(self) -> Iterator[range]:
+        """
+        Iterate over our segments as range objects, so each one can be
+        handled in one go. An unbounded one stops at inf.huge.
+        """
+        return map(range, *self._bounds)
+
+    def iter_chunks(self, size: int, as_array: bool = False) -> Iterator[Any]:
+        """
+        Iterate over our values in batches of at most size.
+
+        By default the batches are range objects, which can't cross a gap,
+        so segments are split into pieces of up to size values. With
+        as_array=True they are numpy arrays, filled across gaps so that
+        all but the last one have exactly size values.
+        """
+        if size < 1:
+            raise ValueError(f"Chunk size must be positive ({size})")
+
+        if not as_array:
+            for start, stop in zip(*self._bounds):
+                for pos in range(start, stop, size):
+                    yield range(pos, min(pos + size, stop))
+            return
+
+        if not NUMPY:
+            raise ImportError("iter_chunks(as_array=True) needs numpy")
+
+        pieces, wanted = [], size
+        for start, stop in zip(*self._bounds):
+            while start < stop:
+                end = min(start + wanted, stop)
+                pieces.append(np.arange(start, end, dtype=np.int64))
+                wanted -= end - start
+                start = end
+                if not wanted:
+                    yield np.concatenate(pieces)
+                    pieces, wanted = [], size
+
+        if pieces:
+            yield np.concatenate(pieces)
 
     def intersects(self, other: Any) -> bool:
         """
         True if this range overlaps with the other range
         """
         other: Ranges = Ranges(other)
-        for r in self.segments:
-            for o in other.segments:
-                if r.intersects(o):
-                    return True
-
-        return False
+        return overlaps(self._bounds, other._bounds)
 
     def union(self, other) -> "Ranges":
         """
         Return the union of this range and the other
         """
-        return Ranges(self + other)
+        return self + other
 
     def __or__(self, other: "Ranges") -> "Ranges":
         """
@@ -250,25 +703,10 @@ class Ranges(str):
         """
         Return the intersection of this range and the other
         """
-        # Create a sorted list of all the boundary points from both ranges.
-        boundary_points = sorted(
-            set(
-                [s.start for s in self.segments]
-                + [s.stop for s in self.segments]
-                + [s.start for s in other.segments]
-                + [s.stop for s in other.segments]
-            )
-        )
-
-        # Use these boundary points to find intersecting segments.
-        intersected_segments = []
-        for i in range(len(boundary_points) - 1):
-            start, end = boundary_points[i], boundary_points[i + 1]
-            new_seg = Segment(start, end)
-            if new_seg in self and new_seg in other:
-                intersected_segments.append(new_seg)
+        if not isinstance(other, Ranges):
+            other = Ranges(other)
 
-        return Ranges(intersected_segments)
+        return self._apply(other, intersect, operator.and_)
 
     def __le__(self, other: "Ranges") -> bool:
         """
@@ -301,29 +739,79 @@ class Ranges(str):
         if not isinstance(other, Ranges):
             other = Ranges(other)
 
-        return self & ~other
+        return self._apply(other, subtract, _and_not)
 
     def __invert__(self):
         """
         The inverse of this range
         """
+        return self._from_bounds(complement(self._bounds))
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode in a compact binary form, which is usually a lot smaller than
+        the string and is read back by from_bytes() without any parsing.
+        """
+        return encode_bounds(*self._bounds)
+
+    def to_http_range(self) -> str:
+        """
+        Format as an HTTP Range header value, like "bytes=0-99,200-"
+        """
         if not self:
-            return Ranges(":")
+            raise ValueError("Can't request an empty range")
 
-        segments = []
+        parts = []
+        for start, stop in zip(*self._bounds):
+            parts.append(f"{start}-" if stop >= inf.huge else f"{start}-{stop - 1}")
+        return "bytes=" + ",".join(parts)
 
-        if self.first > 0:
-            segments.append(Segment(0, self.first))
+    def content_ranges(self, length: int | None = None) -> list[str]:
+        """
+        The Content-Range header value for each segment, for sending them in
+        a multipart/byteranges response. length is the size of the whole
+        content. Segments are cut off there, and ones that start after it
+        are left out. If it's None the size is given as "*", and then we
+        can't have an unbounded segment.
+        """
+        total = "*" if length is None else length
+        end = inf.huge if length is None else length
 
-        for i in range(len(self.segments)):
-            if i == len(self.segments) - 1:
-                segments.append(Segment(self.segments[i].stop, inf))
-            else:
-                segments.append(
-                    Segment(self.segments[i].stop, self.segments[i + 1].start)
-                )
+        values = []
+        for start, stop in zip(*self._bounds):
+            if start >= end:
+                break
+            stop = min(stop, end)
+            if stop >= inf.huge:
+                raise ValueError("Need a length for an unbounded range")
+            values.append(f"bytes {start}-{stop - 1}/{total}")
+        return values
+
+    def coalesce(self, max_gap: int) -> "Ranges":
+        """
+        Fill in gaps of max_gap or less, so segments that are close together
+        become one. Useful for planning reads, when fetching a few values
+        you don't need is cheaper than another request.
+        """
+        if max_gap < 0:
+            raise ValueError(f"max_gap can't be negative ({max_gap})")
+        return self._from_bounds(coalesce(self._bounds, max_gap))
+
+    def coalesce_overhead(self, max_gap: int) -> int:
+        """
+        How many values coalesce(max_gap) would add, which is the total size
+        of the gaps it fills.
+        """
+        if max_gap < 0:
+            raise ValueError(f"max_gap can't be negative ({max_gap})")
 
-        return Ranges(segments)
+        starts, stops = self._bounds
+        extra = 0
+        for i in range(1, len(starts)):
+            gap = starts[i] - stops[i - 1]
+            if gap <= max_gap:
+                extra += gap
+        return extra
 
     @classmethod
     def validate(cls, value: Any) -> "Ranges":
@@ -352,7 +840,10 @@ class Ranges(str):
         The start value of the first segment.
         Called "first" rather than "start" so that Ranges are not "range-like" things.
         """
-        return self.segments[0].start
+        if type(self._store) is Bitmap:
+            return self._store.first()
+        starts, _ = self._store
+        return starts[0] if starts else 0
 
     @property
     def last(self):
@@ -360,4 +851,7 @@ class Ranges(str):
         The last value of the final segment.
         Exposing "last" rather than "stop" so that Ranges are not "range-like" things.
         """
-        return self.segments[-1].last
+        if type(self._store) is Bitmap:
+            return _stop(self._store.stop()) - 1
+        _, stops = self._store
+        return _stop(stops[-1]) - 1 if stops else -1
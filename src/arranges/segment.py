@@ -1,15 +1,24 @@
-import re
-from functools import lru_cache
+from itertools import count
 from typing import Any
 
-from arranges.utils import as_type, inf, is_intlike, is_iterable, is_rangelike, to_int
+from arranges.cache import cached
+from arranges.parse import parse_segment
+from arranges.utils import as_type, inf, is_intlike, is_iterable, is_rangelike
 
 range_idx = int | float
 
 
 def fix_start_stop(start: range_idx, stop: range_idx) -> tuple[range_idx, range_idx]:
-    start = 0 if start is None else (int(start) if start != inf else inf)
-    stop = inf if stop in (None, inf) else int(stop)
+    # Plain ints are checked first, to avoid going through inf.__eq__
+    if type(start) is not int:
+        start = 0 if start is None else (int(start) if start != inf else inf)
+    elif start == inf.huge:
+        start = inf
+
+    if type(stop) is not int:
+        stop = inf if stop is None or stop == inf else int(stop)
+    elif stop == inf.huge:
+        stop = inf
 
     if start > stop:
         raise ValueError(f"Stop ({stop}) can't be before start ({start})")
@@ -17,27 +26,39 @@ def fix_start_stop(start: range_idx, stop: range_idx) -> tuple[range_idx, range_
     if start < 0 or stop < 0:
         raise ValueError("Can't have a range with negative values")
 
+    # Anything bigger than inf.huge would be formatted as having no end
+    if (type(start) is int and start > inf.huge) or (
+        type(stop) is int and stop > inf.huge
+    ):
+        raise ValueError("Can't have a range with values past sys.maxsize")
+
     return start, stop
 
 
-def start_stop_to_str(start: range_idx, stop: range_idx) -> str:
+def format_bounds(start: range_idx, stop: range_idx) -> str:
     """
-    Returns a string representation of a segment from start to stop.
+    Returns the canonical string for a start and stop that have already been
+    checked. A stop of inf or inf.huge is unbounded.
     """
-    start, stop = fix_start_stop(start, stop)
-
     if start == stop:
         return ""
 
     if stop == start + 1:
-        return str(int(start))
+        return str(start)
 
-    start_str = str(int(start)) if start else ""
-    stop_str = str(int(stop)) if stop is not inf else ""
+    start_str = str(start) if start else ""
+    stop_str = str(stop) if stop < inf.huge else ""
 
     return f"{start_str}:{stop_str}"
 
 
+def start_stop_to_str(start: range_idx, stop: range_idx) -> str:
+    """
+    Returns a string representation of a segment from start to stop.
+    """
+    return format_bounds(*fix_start_stop(start, stop))
+
+
 class Segment(str):
     """
     A single range segment that's a string and can be hashed.
@@ -47,17 +68,23 @@ class Segment(str):
     stop: int = inf
     step: int = 1
 
-    def __init__(self, start: range_idx, stop: range_idx = None):
+    def __new__(cls, start: range_idx, stop: range_idx = None) -> str:
         """
         Construct a new string with the canonical form of the segment.
         """
-        self.start, self.stop = fix_start_stop(start, stop)
+        return cls._from_bounds(*fix_start_stop(start, stop))
 
-    def __new__(cls, start: range_idx, stop: range_idx = None) -> str:
+    @classmethod
+    def _from_bounds(cls, start: int, stop: range_idx) -> "Segment":
         """
-        Construct a new string with the canonical form of the segment.
+        Construct from a start and stop that are already valid, like the ones
+        from other segments, without checking them again. An unbounded stop
+        must be inf. Internal use only.
         """
-        return str.__new__(cls, start_stop_to_str(start, stop))
+        ret = str.__new__(cls, format_bounds(start, stop))
+        ret.start = start
+        ret.stop = stop
+        return ret
 
     def __hash__(self):
         return hash(str(self))
@@ -78,16 +105,15 @@ class Segment(str):
         start = min(self.start, other.start)
         stop = max(self.stop, other.stop)
 
-        return Segment(start, stop)
+        return Segment._from_bounds(start, stop)
 
     def __iter__(self):
         """
         Iterate over the values in this segment
         """
-        i = self.start
-        while i < self.stop:
-            yield i
-            i += 1
+        if self.stop == inf:
+            return count(self.start)
+        return iter(range(self.start, self.stop))
 
     def __len__(self) -> int:
         """
@@ -118,30 +144,12 @@ class Segment(str):
         return self.stop - 1
 
     @classmethod
-    @lru_cache
+    @cached("segment_str")
     def from_str(cls, value: str) -> "Segment":
         """
         Construct from a string.
         """
-        vals = [v.strip() for v in re.split(r":|\-", value)]
-
-        if len(vals) > 2:
-            raise ValueError(f"Too many values in {value} ({vals})")
-
-        if len(vals) == 1:
-            if vals[0] == "":
-                # Empty range
-                start = stop = 0
-            else:
-                # single value
-                start = to_int(vals[0], 0)
-                stop = start + 1
-        else:
-            # start:stop
-            start = to_int(vals[0], 0)
-            stop = to_int(vals[1], inf)
-
-        return cls(start, stop)
+        return cls(*parse_segment(value))
 
     @staticmethod
     def sort_key(value: "Segment") -> tuple[int, int]:
@@ -166,8 +174,7 @@ class Segment(str):
         if isinstance(other, Ranges):
             # Only convert single-segment Ranges to Segment for comparison
             if len(other.segments) == 1:
-                seg = other.segments[0]
-                return Segment(seg.start, seg.stop)
+                return other.segments[0]
             return other
 
         # Special handling for integers - treat as single value [n, n+1)
@@ -296,8 +303,9 @@ class Segment(str):
 
         # Check for Ranges before rangelike/iterable
         if isinstance(other, Ranges):
-            # Delegate to Ranges' logic
-            return other in Ranges(self)
+            if not other:
+                return True
+            return self.start <= other.first and other.last <= self.last
 
         if is_rangelike(other):
             if not other:
@@ -0,0 +1,188 @@
+"""
+A sorted list of spans split into blocks, so that changing a few of them only
+shuffles along the rest of one block rather than the whole list.
+
+Spans are (start, stop, key) tuples and are found by position or by start.
+Each block keeps its starts, stops and keys in parallel lists, with the first
+start of every block alongside to bisect into, and block sizes in a Fenwick
+tree to find positions. Blocks are split once they get to twice LOAD long and
+joined to a neighbour when they drop under half of it, so changing a few spans
+costs O(log n + LOAD).
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Iterable, Iterator
+
+LOAD = 1000
+"""
+How many spans a block is made with
+"""
+
+
+class SpanList:
+    """
+    (start, stop, key) spans in order of start
+    """
+
+    __slots__ = ("_starts", "_stops", "_keys", "_firsts", "_tree", "_size")
+
+    def __init__(self, spans: Iterable[tuple[int, int, int]] = ()):
+        spans = list(spans)
+        self._starts = []  # blocks of span starts
+        self._stops = []  # blocks of span stops, same shape as _starts
+        self._keys = []  # blocks of span keys, same shape as _starts
+        for i in range(0, len(spans), LOAD):
+            block = spans[i : i + LOAD]
+            self._starts.append([span[0] for span in block])
+            self._stops.append([span[1] for span in block])
+            self._keys.append([span[2] for span in block])
+        self._reindex()
+
+    def _reindex(self):
+        """
+        Work out the first starts and the Fenwick tree from the blocks
+        """
+        self._firsts = [block[0] for block in self._starts]
+        self._tree = [0, *map(len, self._starts)]
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+        self._size = sum(map(len, self._starts))
+
+    def _grow(self, b: int, count: int):
+        """
+        Record that block b got count spans longer
+        """
+        self._size += count
+        i = b + 1
+        while i < len(self._tree):
+            self._tree[i] += count
+            i += i & -i
+
+    def _offset(self, b: int) -> int:
+        """
+        How many spans come before block b
+        """
+        total = 0
+        while b:
+            total += self._tree[b]
+            b &= b - 1
+        return total
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """
+        The block a position is in and where it is in that block. The end
+        is found at the end of the last block.
+        """
+        if index >= self._size:
+            b = len(self._starts) - 1
+            return b, index - self._size + len(self._starts[b])
+
+        b = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if b + step < len(self._tree) and self._tree[b + step] <= index:
+                b += step
+                index -= self._tree[b]
+            step >>= 1
+        return b, index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def bisect_left(self, start: int, lo: int = 0) -> int:
+        """
+        How many spans start before start, or lo if that's more
+        """
+        b = bisect_left(self._firsts, start) - 1
+        if b < 0:
+            return lo
+        return max(self._offset(b) + bisect_left(self._starts[b], start), lo)
+
+    def bisect_right(self, start: int, lo: int = 0) -> int:
+        """
+        How many spans start at or before start, or lo if that's more
+        """
+        b = bisect_right(self._firsts, start) - 1
+        if b < 0:
+            return lo
+        return max(self._offset(b) + bisect_right(self._starts[b], start), lo)
+
+    def span(self, index: int) -> tuple[int, int, int]:
+        """
+        The span at a position
+        """
+        if not 0 <= index < self._size:
+            raise IndexError("span index out of range")
+        b, i = self._locate(index)
+        return self._starts[b][i], self._stops[b][i], self._keys[b][i]
+
+    def spans(self, index: int = 0) -> Iterator[tuple[int, int, int]]:
+        """
+        The spans in order, from a position onwards
+        """
+        if index >= self._size:
+            return
+        b, i = self._locate(index)
+        yield from zip(self._starts[b][i:], self._stops[b][i:], self._keys[b][i:])
+        for b in range(b + 1, len(self._starts)):
+            yield from zip(self._starts[b], self._stops[b], self._keys[b])
+
+    def replace(
+        self, lo: int, hi: int, spans: Iterable[tuple[int, int, int]]
+    ) -> list[int]:
+        """
+        Swap the spans from lo to hi for others, returning the keys of the
+        ones that were taken out
+        """
+        if not self._starts:
+            self.__init__(spans)
+            return []
+
+        b, i = self._locate(lo)
+        e, j = self._locate(hi)
+        if e > b and not j:
+            e, j = e - 1, len(self._starts[e - 1])
+        blocks = (self._starts, self._stops, self._keys)
+        if b < e:
+            # Gather everything from lo to hi into one block first
+            j += self._offset(e) - self._offset(b)
+            for block in blocks:
+                block[b : e + 1] = [list(chain.from_iterable(block[b : e + 1]))]
+
+        spans = list(spans)
+        removed = self._keys[b][i:j]
+        for n, block in enumerate(blocks):
+            block[b][i:j] = [span[n] for span in spans]
+
+        size = len(self._starts[b])
+        if b < e or not size or size > 2 * LOAD:
+            self._balance(b)
+        elif size < LOAD // 2 and len(self._starts) > 1:
+            self._balance(b - 1 if b else b)
+        else:
+            self._firsts[b] = self._starts[b][0]
+            self._grow(b, len(spans) - len(removed))
+        return removed
+
+    def _balance(self, b: int):
+        """
+        Share out the spans in block b and the one after it in fresh blocks,
+        then reindex
+        """
+        for block in (self._starts, self._stops, self._keys):
+            items = list(chain.from_iterable(block[b : b + 2]))
+            block[b : b + 2] = [items[k : k + LOAD] for k in range(0, len(items), LOAD)]
+        self._reindex()
+
+    def copy(self) -> "SpanList":
+        new = object.__new__(SpanList)
+        new._starts = list(map(list.copy, self._starts))
+        new._stops = list(map(list.copy, self._stops))
+        new._keys = list(map(list.copy, self._keys))
+        new._firsts = self._firsts.copy()
+        new._tree = self._tree.copy()
+        new._size = self._size
+        return new
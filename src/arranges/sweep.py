@@ -0,0 +1,130 @@
+"""
+Single-pass sweeps over bounds: pairs of sorted start and stop arrays, as
+kept by Ranges and RangesBuilder.
+"""
+
+from array import array
+
+from arranges.utils import inf
+
+
+Bounds = tuple[array, array]
+"""
+A pair of packed int64 arrays holding the starts and stops of sorted,
+merged, non-empty segments. An unbounded stop is stored as `inf.huge`.
+"""
+
+
+def union(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Merge two sets of bounds in a single pass, joining anything that touches.
+    """
+    (a_starts, a_stops), (b_starts, b_stops) = a, b
+    starts, stops = array("q"), array("q")
+    i = j = 0
+    while i < len(a_starts) or j < len(b_starts):
+        if j == len(b_starts) or (i < len(a_starts) and a_starts[i] <= b_starts[j]):
+            start, stop = a_starts[i], a_stops[i]
+            i += 1
+        else:
+            start, stop = b_starts[j], b_stops[j]
+            j += 1
+        if stops and start <= stops[-1]:
+            stops[-1] = max(stop, stops[-1])
+        else:
+            starts.append(start)
+            stops.append(stop)
+    return starts, stops
+
+
+def intersect(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Two-pointer sweep over two sets of bounds, returning the parts that are
+    in both.
+    """
+    (a_starts, a_stops), (b_starts, b_stops) = a, b
+    starts, stops = array("q"), array("q")
+    i = j = 0
+    while i < len(a_starts) and j < len(b_starts):
+        start = max(a_starts[i], b_starts[j])
+        stop = min(a_stops[i], b_stops[j])
+        if start < stop:
+            starts.append(start)
+            stops.append(stop)
+        if a_stops[i] < b_stops[j]:
+            i += 1
+        else:
+            j += 1
+    return starts, stops
+
+
+def subtract(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Sweep over two sets of bounds, returning the parts of a that aren't in b.
+    """
+    (a_starts, a_stops), (b_starts, b_stops) = a, b
+    starts, stops = array("q"), array("q")
+    j = 0
+    for start, stop in zip(a_starts, a_stops):
+        # skip the ones that end before we start
+        while j < len(b_starts) and b_stops[j] <= start:
+            j += 1
+        k = j
+        while start < stop and k < len(b_starts) and b_starts[k] < stop:
+            if b_starts[k] > start:
+                starts.append(start)
+                stops.append(b_starts[k])
+            start = max(start, b_stops[k])
+            k += 1
+        if start < stop:
+            starts.append(start)
+            stops.append(stop)
+    return starts, stops
+
+
+def complement(a: Bounds) -> Bounds:
+    """
+    The gaps between a set of bounds, up to infinity.
+    """
+    starts, stops = array("q"), array("q")
+    pos = 0
+    for start, stop in zip(*a):
+        if start > pos:
+            starts.append(pos)
+            stops.append(start)
+        pos = stop
+    if pos < inf.huge:
+        starts.append(pos)
+        stops.append(inf.huge)
+    return starts, stops
+
+
+def coalesce(a: Bounds, max_gap: int) -> Bounds:
+    """
+    Join up segments that have gaps of max_gap or less between them
+    """
+    starts, stops = array("q"), array("q")
+    for start, stop in zip(*a):
+        if stops and start - stops[-1] <= max_gap:
+            stops[-1] = stop
+        else:
+            starts.append(start)
+            stops.append(stop)
+    return starts, stops
+
+
+def overlaps(a: Bounds, b: Bounds) -> bool:
+    """
+    True if anything in a overlaps anything in b. Same sweep as intersect,
+    but stops at the first hit.
+    """
+    (a_starts, a_stops), (b_starts, b_stops) = a, b
+    i = j = 0
+    while i < len(a_starts) and j < len(b_starts):
+        if max(a_starts[i], b_starts[j]) < min(a_stops[i], b_stops[j]):
+            return True
+        if a_stops[i] < b_stops[j]:
+            i += 1
+        else:
+            j += 1
+    return False
@@ -0,0 +1,354 @@
+"""
+A persistent list of spans in order, as a treap whose nodes are never changed
+once they're made.
+
+Every change builds new nodes along the paths it touches and shares all the
+others, so an old root keeps reading exactly as it did. Two owners can hold
+the same root and go their own ways, which makes copying free.
+
+Spans are (start, stop, key) tuples and are found by position or by start.
+PersistentMap is a dict built the same way, from trees of Entry nodes.
+"""
+
+from random import Random
+from typing import Any, Iterable, Iterator
+
+_random = Random()
+"""
+Where node priorities come from, so making trees doesn't move anyone else's
+seeded sequence in the random module
+"""
+
+
+class Node:
+    """
+    One span, the spans before and after it, and how many there are in all
+    """
+
+    __slots__ = ("left", "right", "size", "priority", "start", "stop", "key")
+
+    def __init__(self, left, right, priority, start, stop, key):
+        self.left = left
+        self.right = right
+        self.size = 1 + size(left) + size(right)
+        self.priority = priority
+        self.start = start
+        self.stop = stop
+        self.key = key
+
+
+def size(node: Node | None) -> int:
+    """
+    How many spans are in a tree
+    """
+    return node.size if node is not None else 0
+
+
+def _with(node: Node, left: Node | None, right: Node | None) -> Node:
+    """
+    A new node holding the same span with different children
+    """
+    return Node(left, right, node.priority, node.start, node.stop, node.key)
+
+
+def join(left: Node | None, right: Node | None) -> Node | None:
+    """
+    A tree with all of left's spans followed by all of right's
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        return _with(left, left.left, join(left.right, right))
+    return _with(right, join(left, right.left), right.right)
+
+
+def split(node: Node | None, count: int) -> tuple[Node | None, Node | None]:
+    """
+    Split a tree into its first count spans and the rest
+    """
+    if node is None:
+        return None, None
+    before = size(node.left)
+    if count <= before:
+        head, tail = split(node.left, count)
+        return head, _with(node, tail, node.right)
+    head, tail = split(node.right, count - before - 1)
+    return _with(node, node.left, head), tail
+
+
+def bisect_left(node: Node | None, start: int) -> int:
+    """
+    How many spans start before start
+    """
+    count = 0
+    while node is not None:
+        if node.start < start:
+            count += size(node.left) + 1
+            node = node.right
+        else:
+            node = node.left
+    return count
+
+
+def bisect_right(node: Node | None, start: int) -> int:
+    """
+    How many spans start at or before start
+    """
+    count = 0
+    while node is not None:
+        if node.start <= start:
+            count += size(node.left) + 1
+            node = node.right
+        else:
+            node = node.left
+    return count
+
+
+def at(node: Node | None, index: int) -> tuple[int, int, int]:
+    """
+    The span at a position
+    """
+    while node is not None:
+        before = size(node.left)
+        if index < before:
+            node = node.left
+        elif index > before:
+            index -= before + 1
+            node = node.right
+        else:
+            return node.start, node.stop, node.key
+    raise IndexError("span index out of range")
+
+
+def spans(node: Node | None, index: int = 0) -> Iterator[tuple[int, int, int]]:
+    """
+    The spans in order, from a position onwards
+    """
+    # Walk down to the first one, keeping the nodes still to come
+    stack = []
+    while node is not None:
+        before = size(node.left)
+        if index <= before:
+            stack.append(node)
+            node = node.left
+        else:
+            index -= before + 1
+            node = node.right
+
+    while stack:
+        node = stack.pop()
+        yield node.start, node.stop, node.key
+        node = node.right
+        while node is not None:
+            stack.append(node)
+            node = node.left
+
+
+def build(items: Iterable[tuple[int, int, int]]) -> Node | None:
+    """
+    A tree holding spans that are already in order, in linear time
+    """
+    items = list(items)
+    priorities = [_random.random() for _ in items]
+
+    # Lay out the treap with a stack of the right-hand edge, by index
+    lefts, rights = [-1] * len(items), [-1] * len(items)
+    stack = []
+    for i, priority in enumerate(priorities):
+        last = -1
+        while stack and priorities[stack[-1]] < priority:
+            last = stack.pop()
+        lefts[i] = last
+        if stack:
+            rights[stack[-1]] = i
+        stack.append(i)
+
+    def make(i):
+        if i < 0:
+            return None
+        start, stop, key = items[i]
+        return Node(make(lefts[i]), make(rights[i]), priorities[i], start, stop, key)
+
+    return make(stack[0]) if stack else None
+
+
+def splice(
+    node: Node | None, lo: int, hi: int, items: Iterable[tuple[int, int, int]]
+) -> tuple[Node | None, list[tuple[int, int, int]]]:
+    """
+    A tree with the spans from lo to hi swapped for items, and the spans that
+    were taken out
+    """
+    head, rest = split(node, lo)
+    middle, tail = split(rest, hi - lo)
+    return join(join(head, build(items)), tail), list(spans(middle))
+
+
+class Entry:
+    """
+    One key and value in a tree sorted by key, and the entries either side
+    """
+
+    __slots__ = ("left", "right", "priority", "key", "value")
+
+    def __init__(self, left, right, priority, key, value):
+        self.left = left
+        self.right = right
+        self.priority = priority
+        self.key = key
+        self.value = value
+
+
+def _find(entry: Entry | None, key) -> Entry | None:
+    """
+    The entry for a key, if there is one
+    """
+    while entry is not None:
+        if key < entry.key:
+            entry = entry.left
+        elif key > entry.key:
+            entry = entry.right
+        else:
+            return entry
+    return None
+
+
+def _put(entry: Entry | None, key, value) -> Entry:
+    """
+    A tree with key set to value, rotating a new entry up into place
+    """
+    if entry is None:
+        return Entry(None, None, _random.random(), key, value)
+    if key == entry.key:
+        return Entry(entry.left, entry.right, entry.priority, key, value)
+
+    if key < entry.key:
+        left = _put(entry.left, key, value)
+        if left.priority > entry.priority:
+            below = Entry(
+                left.right, entry.right, entry.priority, entry.key, entry.value
+            )
+            return Entry(left.left, below, left.priority, left.key, left.value)
+        return Entry(left, entry.right, entry.priority, entry.key, entry.value)
+
+    right = _put(entry.right, key, value)
+    if right.priority > entry.priority:
+        below = Entry(entry.left, right.left, entry.priority, entry.key, entry.value)
+        return Entry(below, right.right, right.priority, right.key, right.value)
+    return Entry(entry.left, right, entry.priority, entry.key, entry.value)
+
+
+def _drop(entry: Entry, key) -> Entry | None:
+    """
+    A tree without a key that's in it
+    """
+    if key == entry.key:
+        return _join_entries(entry.left, entry.right)
+    if key < entry.key:
+        left, right = _drop(entry.left, key), entry.right
+    else:
+        left, right = entry.left, _drop(entry.right, key)
+    return Entry(left, right, entry.priority, entry.key, entry.value)
+
+
+def _join_entries(left: Entry | None, right: Entry | None) -> Entry | None:
+    """
+    A tree with all of left's entries followed by all of right's
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        joined = _join_entries(left.right, right)
+        return Entry(left.left, joined, left.priority, left.key, left.value)
+    joined = _join_entries(left, right.left)
+    return Entry(joined, right.right, right.priority, right.key, right.value)
+
+
+def _walk(entry: Entry | None) -> Iterator[Entry]:
+    """
+    The entries in key order
+    """
+    stack = []
+    while stack or entry is not None:
+        while entry is not None:
+            stack.append(entry)
+            entry = entry.left
+        entry = stack.pop()
+        yield entry
+        entry = entry.right
+
+
+class PersistentMap:
+    """
+    A dict-like mapping whose copies share their structure. copy() is O(1),
+    and each change builds O(log n) new entries.
+
+    Keys are kept in two trees: one from each key to when it was first set,
+    and one from that to the key and its value, which is walked to iterate
+    in insertion order like a dict. Keys need to be orderable as well as
+    hashable.
+    """
+
+    __slots__ = ("_orders", "_items", "_added", "_size")
+
+    def __init__(self):
+        self._orders = None  # key: order
+        self._items = None  # order: (key, value)
+        self._added = 0  # order for the next new key
+        self._size = 0
+
+    def __getitem__(self, key):
+        found = _find(self._orders, key)
+        if found is None:
+            raise KeyError(key)
+        return _find(self._items, found.value).value[1]
+
+    def __setitem__(self, key, value):
+        found = _find(self._orders, key)
+        if found is not None:
+            order = found.value
+        else:
+            order = self._added
+            self._added += 1
+            self._size += 1
+            self._orders = _put(self._orders, key, order)
+        self._items = _put(self._items, order, (key, value))
+
+    def __delitem__(self, key):
+        found = _find(self._orders, key)
+        if found is None:
+            raise KeyError(key)
+        self._orders = _drop(self._orders, key)
+        self._items = _drop(self._items, found.value)
+        self._size -= 1
+
+    def __contains__(self, key) -> bool:
+        return _find(self._orders, key) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator:
+        return (key for key, _ in self.items())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        return (entry.value for entry in _walk(self._items))
+
+    def values(self) -> Iterator:
+        return (value for _, value in self.items())
+
+    def copy(self) -> "PersistentMap":
+        new = object.__new__(PersistentMap)
+        new._orders, new._items = self._orders, self._items
+        new._added, new._size = self._added, self._size
+        return new
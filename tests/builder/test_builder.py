@@ -0,0 +1,100 @@
+import random
+
+import pytest
+from arranges import Ranges, RangesBuilder, inf
+
+
+def test_empty():
+    assert RangesBuilder().build() == Ranges("")
+
+
+def test_in_order():
+    b = RangesBuilder()
+    for i in [1, 2, 3, 5, 6, 10]:
+        b.add(i)
+    assert b.build() == Ranges("1:4,5:7,10")
+
+
+def test_out_of_order_matches_constructor():
+    values = list(range(0, 2000, 3)) + list(range(1, 500))
+    random.Random(0).shuffle(values)
+
+    b = RangesBuilder()
+    for value in values:
+        b.add(value)
+
+    assert b.build() == Ranges(values)
+
+
+def test_segments():
+    b = RangesBuilder()
+    b.add_segment(10, 20)
+    b.add_segment(0, 5)
+    b.add_segment(5, 10)
+    b.add_segment(30)
+    b.add_segment(7, 7)
+
+    assert b.build() == Ranges("0:20,30:")
+    assert b.build().last == inf
+
+
+def test_discard():
+    b = RangesBuilder()
+    b.add_segment(0, 100)
+    b.discard(50)
+    b.discard_segment(10, 20)
+    b.discard_segment(90, None)
+    b.discard(500)
+
+    assert b.build() == Ranges("0:10,20:50,51:90")
+
+
+def test_discard_sees_pending_adds():
+    b = RangesBuilder()
+    b.add_segment(50, 60)
+    b.add_segment(0, 10)  # out of order, so pending
+    b.discard_segment(5, 55)
+
+    assert b.build() == Ranges("0:5,55:60")
+
+
+def test_discards_wait_with_adds():
+    b = RangesBuilder()
+    b.add_segment(50, 60)
+    b.add_segment(0, 10)  # pending from here on
+    b.discard_segment(0, 100)
+    b.add_segment(20, 30)
+    b.discard(25)
+    b.add_segment(5, 8)
+
+    assert b._pending
+    assert b.build() == Ranges("5:8,20:25,26:30")
+
+
+def test_build_is_a_snapshot():
+    b = RangesBuilder()
+    b.add(1)
+    first = b.build()
+    b.add(2)
+
+    assert first == Ranges("1")
+    assert b.build() == Ranges("1:3")
+
+
+def test_pairs_and_bounds():
+    b = RangesBuilder()
+    b.add_pairs([(10, 20), (0, 5), (5, 5), (30, inf.huge)])
+    starts, stops = b.bounds()
+
+    assert list(starts) == [0, 10, 30]
+    assert list(stops) == [5, 20, inf.huge]
+    b.add(5)
+    assert list(starts) == [0, 10, 30]
+    assert b.build() == Ranges(":6,10:20,30:")
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        RangesBuilder().add(-1)
+    with pytest.raises(ValueError):
+        RangesBuilder().add_segment(10, 5)
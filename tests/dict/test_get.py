@@ -215,3 +215,34 @@ def test_get_method_with_intersection():
     # Should work with ranges too
     assert d.get(slice(100, 150)) == "highlight"
     assert d.get(slice(50, 75)) is None
+
+
+def test_get_among_many_spans():
+    """Lookups should find the right span out of lots of them"""
+    d = Dict()
+    for i in range(0, 1000, 10):
+        d[i : i + 5] = i
+
+    assert len(d) == 100
+    assert d[0] == 0
+    assert d[503] == 500
+    assert d[990:995] == 990
+    assert 505 not in d
+    assert d.get(997) is None
+
+
+def test_get_multi_segment_query():
+    """A query with gaps only needs its own positions covered"""
+    d = Dict()
+    d[0:10] = "a"
+    d[20:30] = "a"
+    d[40:50] = "b"
+
+    assert d["2:5,22:25"] == "a"
+    assert "5,45" in d
+
+    with pytest.raises(KeyError):
+        d["5:25"]
+
+    with pytest.raises(ValueError):
+        d["5,45"]
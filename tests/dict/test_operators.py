@@ -315,3 +315,35 @@ def test_hash_not_supported():
     # Can't be added to sets
     with pytest.raises(TypeError):
         {d}
+
+
+def test_equality_needs_same_spans():
+    """Equal values over differently cut spans aren't equal"""
+    d1 = Dict()
+    d1[0:5] = [1]
+    d1[5:10] = [1.0]
+
+    d2 = Dict()
+    d2[0:10] = [1]
+    d2[20:30] = "other"
+
+    assert d1 != d2
+    assert d2 != d1
+
+
+def test_union_of_many_spans():
+    """Merging two big Dicts matches setting every key in turn"""
+    d1, d2 = Dict(), Dict()
+    for i in range(1000):
+        d1[i * 10 : i * 10 + 5] = i % 7
+        d2[i * 10 + 3 : i * 10 + 8] = i % 5
+
+    expected = d1.copy()
+    for key, value in d2.items():
+        expected[key] = value
+
+    assert d1 | d2 == expected
+    assert list((d1 | d2).items()) == list(expected.items())
+
+    d1 |= d2
+    assert d1 == expected
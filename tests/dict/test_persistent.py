@@ -0,0 +1,143 @@
+"""Test PersistentDict snapshots sharing their structure"""
+
+import random
+
+import pytest
+
+from arranges import Dict, PersistentDict, treap
+
+
+def test_behaves_like_dict():
+    """Same reads and writes as a Dict"""
+    d = PersistentDict({"0:10": "a", "20:30": "b"})
+    d[5:25] = "c"
+
+    assert isinstance(d, Dict)
+    assert list(d.items()) == [(":5", "a"), ("5:25", "c"), ("25:30", "b")]
+    assert d[5:25] == "c"
+    assert d.get(15) == "c"
+    assert 40 not in d
+    assert repr(d) == "PersistentDict({':5': 'a', '5:25': 'c', '25:30': 'b'})"
+
+
+def test_copy_shares_structure():
+    """copy() hands over the same tree and value tables"""
+    d = PersistentDict()
+    d[0:10] = "a"
+    copied = d.copy()
+
+    assert type(copied) is PersistentDict
+    assert copied._root is d._root
+    assert copied._values._items is d._values._items
+    assert copied._counts._items is d._counts._items
+
+
+def test_old_versions_stay_readable():
+    """Writing to a copy leaves every earlier version as it was"""
+    versions = [PersistentDict()]
+    for i in range(50):
+        d = versions[-1].copy()
+        d[i * 10 : i * 10 + 5] = i % 3
+        versions.append(d)
+
+    for n, version in enumerate(versions):
+        assert len(version) == n
+        for i in range(50):
+            assert version.get(i * 10) == (i % 3 if i < n else None)
+
+
+def test_writes_to_original_dont_reach_copy():
+    """Both sides of a copy can change independently"""
+    d = PersistentDict({"0:100": "a"})
+    copied = d.copy()
+
+    del d[40:60]
+    d[0:10] = "b"
+    copied[90:110] = "c"
+
+    assert list(d.items()) == [(":10", "b"), ("10:40", "a"), ("60:100", "a")]
+    assert list(copied.items()) == [(":90", "a"), ("90:110", "c")]
+    assert set(d.values()) == {"a", "b"}
+    assert set(copied.values()) == {"a", "c"}
+
+
+def test_clear_copy():
+    """Clearing one side doesn't empty the other"""
+    d = PersistentDict({"0:10": "a"})
+    copied = d.copy()
+    copied.clear()
+
+    assert not copied
+    assert d[0:10] == "a"
+
+
+def test_popitem():
+    """Items come off the front"""
+    d = PersistentDict({"5:10": "a", "0:2": "b"})
+    snapshot = d.copy()
+
+    assert d.popitem() == (":2", "b")
+    assert d.popitem() == ("5:10", "a")
+    with pytest.raises(KeyError):
+        d.popitem()
+    assert len(snapshot) == 2
+
+
+def test_matches_dict():
+    """Lots of overlapping writes end up the same as in a Dict"""
+    plain, persistent = Dict(), PersistentDict()
+    for i in range(300):
+        start = i * 37 % 1000
+        for d in (plain, persistent):
+            d[start : start + i % 20 + 1] = i % 4
+            if i % 7 == 0:
+                d.pop(start + 3, None)
+
+    assert list(persistent.items()) == list(plain.items())
+    assert persistent.ranges == plain.ranges
+
+
+def test_treap_splice():
+    """Splicing makes a new tree and leaves the old one alone"""
+    old = treap.build((i * 10, i * 10 + 5, i) for i in range(100))
+    new, removed = treap.splice(old, 10, 20, [(100, 200, -1)])
+
+    assert removed == [(i * 10, i * 10 + 5, i) for i in range(10, 20)]
+    assert treap.size(old) == 100
+    assert treap.size(new) == 91
+    assert treap.at(new, 10) == (100, 200, -1)
+    assert list(treap.spans(new, 89)) == [(980, 985, 98), (990, 995, 99)]
+    assert treap.bisect_left(new, 100) == 10
+    assert treap.bisect_right(new, 100) == 11
+
+
+def test_persistent_map():
+    """Copies of a PersistentMap change independently, in insertion order"""
+    m = treap.PersistentMap()
+    for key in [5, -3, 12, 0]:
+        m[key] = str(key)
+    snapshot = m.copy()
+
+    m[-3] = "changed"
+    del m[12]
+    m[7] = "new"
+
+    assert list(m.items()) == [(5, "5"), (-3, "changed"), (0, "0"), (7, "new")]
+    assert list(snapshot.values()) == ["5", "-3", "12", "0"]
+    assert 12 in snapshot and 12 not in m
+    assert m.get(12, "gone") == "gone"
+    assert len(m) == len(snapshot) == 4
+    with pytest.raises(KeyError):
+        del m[12]
+
+
+def test_leaves_global_random_alone():
+    """Writing doesn't use up numbers from the random module"""
+    random.seed(1)
+    expected = random.random()
+
+    random.seed(1)
+    d = PersistentDict()
+    d[0:5] = "x"
+    d.copy()[3:8] = "y"
+    assert random.random() == expected
@@ -191,3 +191,26 @@ def test_negative_ranges_rejection():
     d = Dict()
     with pytest.raises(ValueError):
         d[-10:10] = "invalid"
+
+
+def test_fill_gap_merges_both_neighbours():
+    """Filling the gap between two spans of the same value joins all three"""
+    d = Dict()
+    d[100:200] = "a"
+    d[200:300] = "b"
+    d[300:400] = "a"
+    assert len(d) == 3
+
+    d[200:300] = "a"
+    assert list(d.items()) == [("100:400", "a")]
+
+
+def test_overwritten_value_is_forgotten():
+    """A value with no spans left shouldn't show up in values()"""
+    d = Dict()
+    d[100:200] = "old"
+    d[150:250] = "new"
+    d[50:150] = "new"
+
+    assert list(d.values()) == ["new"]
+    assert list(d.keys()) == ["50:250"]
@@ -0,0 +1,92 @@
+"""Test the blocked span list behind Dict"""
+
+import random
+
+import pytest
+
+from arranges import Dict, spanlist
+from arranges.spanlist import SpanList
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Blocks of a few spans, so splitting and joining them gets used"""
+    monkeypatch.setattr(spanlist, "LOAD", 4)
+
+
+def test_lookups(small_blocks):
+    """Spans are found by position and by start across blocks"""
+    s = SpanList((i * 10, i * 10 + 5, i % 3) for i in range(30))
+
+    assert len(s) == 30
+    assert len(s._starts) == 8
+    assert s.span(17) == (170, 175, 2)
+    assert list(s.spans(27)) == [(270, 275, 0), (280, 285, 1), (290, 295, 2)]
+    assert s.bisect_left(170) == 17
+    assert s.bisect_right(170) == 18
+    assert s.bisect_right(-5) == 0
+    assert s.bisect_left(1000, 3) == 30
+    with pytest.raises(IndexError):
+        s.span(30)
+
+
+def test_replace(small_blocks):
+    """Replacing spans keeps everything in order and gives back old keys"""
+    expected = [(i * 10, i * 10 + 5, i) for i in range(30)]
+    s = SpanList(expected)
+
+    assert s.replace(3, 14, [(31, 32, -1)]) == list(range(3, 14))
+    expected[3:14] = [(31, 32, -1)]
+    assert s.replace(0, 0, [(-5, -4, -2), (-3, -2, -3)]) == []
+    expected[0:0] = [(-5, -4, -2), (-3, -2, -3)]
+    assert s.replace(len(s), len(s), [(400, 401, -4)]) == []
+    expected.append((400, 401, -4))
+
+    assert list(s.spans()) == expected
+    assert s.bisect_left(31) == 5
+
+
+def test_matches_list(small_blocks):
+    """Lots of random replacements end up the same as on a list"""
+    rng = random.Random(0)
+    s, expected = SpanList(), []
+    for _ in range(500):
+        lo = rng.randrange(len(expected) + 1)
+        hi = min(len(expected), lo + rng.randrange(6))
+        low = expected[lo - 1][0] if lo else -(10**9)
+        high = expected[hi][0] if hi < len(expected) else 10**9
+        starts = {rng.randrange(low + 1, high) for _ in range(rng.randrange(7))}
+        spans = [(start, start, rng.randrange(9)) for start in sorted(starts)]
+
+        assert s.replace(lo, hi, spans) == [span[2] for span in expected[lo:hi]]
+        expected[lo:hi] = spans
+
+    assert len(s) == len(expected)
+    assert list(s.spans()) == expected
+    assert [s.span(i) for i in range(len(s))] == expected
+
+
+def test_copy_is_separate(small_blocks):
+    """Changing a copy leaves the original alone"""
+    s = SpanList((i, i + 1, 0) for i in range(10))
+    copied = s.copy()
+    copied.replace(0, 10, [])
+
+    assert len(s) == 10
+    assert not copied
+    assert list(copied.spans()) == []
+
+
+def test_dict_across_blocks(small_blocks):
+    """A Dict with lots of spans reads and writes the same as with one block"""
+    d = Dict()
+    for i in range(100):
+        d[i * 10 : i * 10 + 5] = i % 2
+    d[42:248] = "x"
+    del d[500:700]
+
+    assert len(d) == 61
+    assert d[42:248] == "x"
+    assert d.get(600) is None
+    assert d[700:705] == 0
+    assert list(d.keys())[:5] == [":5", "10:15", "20:25", "30:35", "40:42"]
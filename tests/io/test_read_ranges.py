@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from arranges import Ranges, io
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 64)
+    return path
+
+
+@pytest.fixture(params=[False, True], ids=["preadv", "mmap"])
+def use_mmap(request):
+    if not request.param and not io.PREADV:
+        pytest.skip("no preadv on this platform")
+    return request.param
+
+
+def test_reads_segments(path, use_mmap):
+    views = io.read_ranges(path, "1:3,100,5000:5004", use_mmap=use_mmap)
+
+    assert [bytes(v) for v in views] == [
+        b"\x01\x02",
+        b"\x64",
+        bytes([136, 137, 138, 139]),
+    ]
+
+
+def test_past_the_end(path, use_mmap):
+    size = path.stat().st_size
+    views = io.read_ranges(path, f"{size - 2}:,{size + 10}", use_mmap=use_mmap)
+
+    assert [bytes(v) for v in views] == [b"\xfe\xff"]
+
+
+def test_matches_take(path, use_mmap):
+    ranges = Ranges("0:10,20:30,9000:9100,16000:")
+    expected = [bytes(v) for v in ranges.take(path.read_bytes())]
+
+    for max_gap in (0, 10, 10_000):
+        views = io.read_ranges(path, ranges, max_gap=max_gap, use_mmap=use_mmap)
+        assert [bytes(v) for v in views] == expected
+
+
+def test_nearby_segments_share_a_read(path):
+    if not io.PREADV:
+        pytest.skip("no preadv on this platform")
+
+    near = io.read_ranges(path, "0:4,8:12", max_gap=4)
+    far = io.read_ranges(path, "0:4,8:12", max_gap=3)
+
+    assert near[0].obj is near[1].obj
+    assert far[0].obj is not far[1].obj
+
+
+def test_file_descriptor_and_object(path, use_mmap):
+    with open(path, "rb") as f:
+        assert bytes(io.read_ranges(f, "255", use_mmap=use_mmap)[0]) == b"\xff"
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        assert bytes(io.read_ranges(fd, "2", use_mmap=use_mmap)[0]) == b"\x02"
+    finally:
+        os.close(fd)
+
+
+def test_empty_file(tmp_path, use_mmap):
+    path = tmp_path / "empty"
+    path.touch()
+
+    assert io.read_ranges(path, ":", use_mmap=use_mmap) == []
+
+
+def test_negative_gap(path):
+    with pytest.raises(ValueError):
+        io.read_ranges(path, "1", max_gap=-1)
@@ -0,0 +1,106 @@
+import pytest
+from arranges import Ranges, Segment, cache
+
+
+@pytest.fixture(autouse=True)
+def restore_sizes():
+    sizes = {name: info.maxsize for name, info in cache.stats().items()}
+    limit = cache.MEMO_LIMIT
+    yield
+    cache.configure(**sizes)
+    cache.set_memo_limit(limit)
+
+
+def test_hits_and_misses(test_id):
+    before = cache.stats()["segment_str"]
+
+    Segment.from_str(f"{test_id}:")
+    Segment.from_str(f"{test_id}:")
+
+    after = cache.stats()["segment_str"]
+    assert after.misses == before.misses + 1
+    assert after.hits == before.hits + 1
+
+
+def test_evictions(test_id):
+    cache.clear()
+    cache.configure(segment_str=2)
+
+    for i in range(5):
+        Segment.from_str(f"{test_id + i}:")
+
+    info = cache.stats()["segment_str"]
+    assert info.currsize == 2
+    assert info.evictions == 3
+    assert info.maxsize == 2
+
+
+def test_disabled(test_id):
+    cache.configure(ranges_iterable=0)
+
+    Ranges([test_id, test_id + 5])
+    Ranges([test_id, test_id + 5])
+
+    info = cache.stats()["ranges_iterable"]
+    assert info.currsize == 0
+    assert info.hits == 0
+
+
+def test_shrinking_evicts(test_id):
+    cache.configure(segment_str=None)
+    for i in range(10):
+        Segment.from_str(str(test_id + i))
+
+    cache.configure(segment_str=3)
+
+    assert cache.stats()["segment_str"].currsize == 3
+
+
+def test_clear(test_id):
+    Segment.from_str(str(test_id))
+
+    cache.clear()
+
+    for info in cache.stats().values():
+        assert info.hits == info.misses == info.evictions == info.currsize == 0
+
+
+def test_unknown_cache():
+    with pytest.raises(ValueError, match="Unknown caches: nope"):
+        cache.configure(nope=10)
+
+
+def test_negative_size():
+    with pytest.raises(ValueError):
+        cache.configure(segment_str=-1)
+
+
+def test_large_iterables_skip_cache(test_id):
+    cache.set_memo_limit(4)
+    before = cache.stats()["ranges_iterable"]
+
+    assert (
+        Ranges([test_id, test_id + 1, test_id + 5])
+        == f"{test_id}:{test_id + 2},{test_id + 5}"
+    )
+    assert (
+        Ranges(list(range(test_id, test_id + 10)) + [0])
+        == f"0,{test_id}:{test_id + 10}"
+    )
+
+    after = cache.stats()["ranges_iterable"]
+    assert after.misses == before.misses + 1
+
+
+def test_generators_skip_cache(test_id):
+    before = cache.stats()["ranges_iterable"]
+
+    ranges = Ranges(i for i in (test_id + 3, test_id, test_id + 1))
+
+    assert ranges == f"{test_id}:{test_id + 2},{test_id + 3}"
+    assert cache.stats()["ranges_iterable"].misses == before.misses
+
+
+def test_negative_memo_limit():
+    with pytest.raises(ValueError):
+        cache.set_memo_limit(-1)
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy(request, monkeypatch):
+    """
+    Run a test with and without numpy, by setting the NUMPY flag in the
+    module that the test module names as numpy_module
+    """
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(request.module.numpy_module, "NUMPY", request.param)
+    return request.param
@@ -0,0 +1,56 @@
+import pytest
+
+from arranges import Ranges, inf
+from arranges import ranges as ranges_module
+from arranges.parse import parse_canonical
+
+
+@pytest.fixture
+def no_full_parse(monkeypatch):
+    def fail(value):
+        raise AssertionError(f"{value!r} was fully parsed")
+
+    monkeypatch.setattr(ranges_module, "parse_bounds", fail)
+
+
+@pytest.mark.parametrize("text", ["", "0", ":10", "1:10,12,20:", "5,7,9", ":"])
+def test_canonical_is_read_once(no_full_parse, text):
+    r = Ranges(text)
+
+    assert r == text
+    assert Ranges(r) == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "0:10",
+        ":1",
+        "1:2",
+        "5:10,10:20",
+        "5,3",
+        "1:10,5",
+        " 1",
+        "01",
+        "0x10",
+        "1;2",
+        "1,",
+        ":9223372036854775807",
+        "5:9223372036854775807",
+    ],
+)
+def test_not_canonical(text):
+    assert parse_canonical(text) is None
+
+
+def test_non_canonical_still_works():
+    assert Ranges("0:10, 5:20") == ":20"
+    assert Ranges("1:2") == "1"
+    assert Ranges(":9223372036854775807") == ":"
+    assert Ranges("5:9223372036854775807") == "5:"
+
+
+def test_canonical_bounds():
+    starts, stops = parse_canonical("1,3:5,10:")
+    assert list(starts) == [1, 3, 10]
+    assert list(stops) == [2, 5, inf.huge]
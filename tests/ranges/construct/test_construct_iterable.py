@@ -1,5 +1,7 @@
 import pytest
 
+from arranges import inf
+from arranges import ranges as ranges_module
 from arranges.ranges import Ranges
 
 
@@ -59,3 +61,45 @@ def test_from_nested_mess():
     ranges = Ranges([[1, [2], ["101:201,30:31"], 3], range(10, 15)])
 
     assert ranges == Ranges("1:4,10:15,30:31,101:201")
+
+
+def test_from_iterable_many_overlapping():
+    spans = [range(i, i + 100) for i in range(0, 100_000, 10)]
+    actual = Ranges.from_iterable(spans)
+
+    assert actual == (":100090",)
+
+
+def test_from_iterable_unsorted():
+    actual = Ranges.from_iterable(["20:30", 5, range(10, 21), "1:3", 4, "50:"])
+
+    assert actual == ("1:3", "4:6", "10:30", "50:")
+
+
+def test_from_iterable_empty_parts():
+    assert Ranges.from_iterable([]) == ()
+    assert Ranges.from_iterable(["", range(5, 5), Ranges("")]) == ()
+    assert Ranges(["", 3, range(5, 5)]) == "3"
+    assert not Ranges([inf])
+    assert list(Ranges([inf, 2])._bounds[0]) == [2]
+
+
+@pytest.mark.parametrize("make", [list, iter], ids=["list", "generator"])
+def test_iterables_are_not_read_back(monkeypatch, make):
+    def fail(value):
+        raise AssertionError(f"{value!r} was parsed again")
+
+    monkeypatch.setattr(ranges_module, "parse_canonical", fail)
+    monkeypatch.setattr(ranges_module, "parse_bounds", fail)
+
+    values = [10, 11, 5, "20:30", range(40, 50)] * 500
+    assert str(Ranges(make(values))) == "5,10:12,20:30,40:50"
+
+
+def test_from_iterable_negative_range():
+    with pytest.raises(ValueError):
+        Ranges([range(-5, 3)])
+
+
+def test_stepped_range_in_iterable():
+    assert Ranges([range(0, 10, 2)]) == "0,2,4,6,8"
@@ -0,0 +1,61 @@
+from array import array
+
+import pytest
+from arranges import Ranges
+from arranges import ranges as ranges_module
+
+
+numpy_module = ranges_module
+
+
+def test_runs(numpy):
+    assert Ranges.from_array(array("q", [1, 2, 3, 5, 9, 10])) == "1:4,5,9:11"
+
+
+def test_unsorted_with_duplicates(numpy):
+    assert Ranges.from_array(array("l", [9, 1, 3, 2, 3, 10, 5, 1])) == "1:4,5,9:11"
+
+
+def test_assume_sorted(numpy):
+    values = array("q", [0, 1, 2, 7])
+
+    assert Ranges.from_array(values, assume_sorted=True) == ":3,7"
+
+
+def test_bytes(numpy):
+    assert Ranges.from_array(b"\x00\x01\x02\x05") == ":3,5"
+
+
+def test_empty(numpy):
+    assert Ranges.from_array(array("q")) == ""
+
+
+def test_negative(numpy):
+    with pytest.raises(ValueError):
+        Ranges.from_array(array("q", [3, -1]))
+
+
+def test_not_integers(numpy):
+    with pytest.raises(TypeError):
+        Ranges.from_array(array("d", [1.0, 2.0]))
+
+
+def test_same_as_list(numpy):
+    values = [0, 1, 2, 4, 4, 5, 8, 100, 101, 99]
+
+    assert Ranges.from_array(array("q", values)) == Ranges(values)
+
+
+def test_numpy_array():
+    np = pytest.importorskip("numpy")
+    values = np.array([7, 3, 4, 5, 11], dtype=np.uint16)
+
+    assert Ranges.from_array(values) == "3:6,7,11"
+    assert Ranges(values) == "3:6,7,11"
+
+
+def test_numpy_not_1d():
+    np = pytest.importorskip("numpy")
+
+    with pytest.raises(TypeError):
+        Ranges.from_array(np.zeros((2, 2), dtype=int))
@@ -0,0 +1,39 @@
+import pytest
+
+from arranges import Ranges, inf
+
+
+def test_parse_str():
+    assert Ranges.parse(" start : 0x10, 0o20-0b10010 ;30:end") == ":16,16:18,30:"
+
+
+def test_parse_bytes():
+    assert Ranges.parse(b"1:5, 7") == "1:5,7"
+    assert Ranges.parse(bytearray(b"10:")) == "10:"
+    assert Ranges.parse(memoryview(b"xx:3,4")[2:]) == ":3,4"
+
+
+def test_parse_unsorted_and_overlapping():
+    r = Ranges.parse("20:30,1,25:40,0,2")
+    assert r == ":3,20:40"
+    assert r.last == 39
+
+
+def test_parse_empty_parts():
+    assert Ranges.parse(",,1,,;") == "1"
+    assert Ranges.parse("") == ""
+    assert Ranges.parse("5:5") == ""
+
+
+def test_parse_unbounded():
+    assert Ranges.parse("5:inf").last == inf
+
+
+@pytest.mark.parametrize("text", ["1:2:3", "x", "1:x", "1 0", "10:1", b"1:-2"])
+def test_parse_invalid(text):
+    with pytest.raises(ValueError):
+        Ranges.parse(text)
+
+
+def test_from_str_takes_bytes():
+    assert Ranges.from_str(b"3:5") == Ranges("3:5").segments
@@ -101,3 +101,17 @@ def test_contains_split_range():
     ranges = Ranges("1:10,20:30,100:150")
 
     assert [1, 3, 25, 125] in ranges
+
+
+def test_contains_points():
+    r = Ranges("2:5,10,20:")
+    assert [i for i in range(25) if i in r] == [2, 3, 4, 10] + list(range(20, 25))
+    assert 10**30 in r
+    assert -1 not in r
+
+
+def test_contains_spans_across_segments():
+    r = Ranges("2:5,10:15")
+    assert "3:5,11" in r
+    assert "4:6" not in r
+    assert "4:11" not in r
@@ -84,3 +84,15 @@ def test_multi_split_single():
     b = "*    *"
     c = "     *"
     assert r(a) & r(b) == r(c)
+
+
+def test_unbounded():
+    assert Ranges("5:") & Ranges(":10,20:30,40:") == Ranges("5:10,20:30,40:")
+
+
+def test_against_brute_force():
+    a = "** *** *   **** * ** ***     ****"
+    b = " ***  ** * *  *** ***   ** *"
+    expected = "".join("*" if x + y == "**" else " " for x, y in zip(a, b))
+    assert r(a) & r(b) == r(expected)
+    assert r(b) & r(a) == r(expected)
@@ -33,3 +33,14 @@ def test_subtraction_edge_cases():
 
     # Subtracting larger range
     assert Ranges("3:7") - "1:10" == Ranges("")
+
+
+def test_subtraction_multiple_holes():
+    """One segment punched by several others"""
+    assert Ranges("0:20") - "2,5:8,10:12,19:" == Ranges("0:2,3:5,8:10,12:19")
+    assert Ranges("0:10,20:30") - "5:25" == Ranges("0:5,25:30")
+
+
+def test_subtraction_unbounded():
+    assert Ranges("10:") - "20:30" == Ranges("10:20,30:")
+    assert Ranges("10:") - "20:" == Ranges("10:20")
@@ -21,3 +21,9 @@ def test_intersects():
 
     assert not Ranges("1:10").intersects(Ranges("11:15"))
     assert not Ranges("1:10").intersects(Ranges("11:"))
+
+
+def test_intersects_many_segments():
+    assert Ranges("1,3,5,7,9").intersects("8:10")
+    assert not Ranges("1,3,5,7,9").intersects("0,2,4,6,8,10:")
+    assert not Ranges("1:10").intersects("")
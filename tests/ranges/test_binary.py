@@ -0,0 +1,52 @@
+import pytest
+from arranges import Ranges
+from arranges import binary
+
+
+numpy_module = binary
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "0", ":", "5:", "1:3,5,300:70000,100000:", "9223372036854775806"],
+)
+def test_round_trip(numpy, text):
+    r = Ranges(text)
+
+    assert Ranges.from_bytes(r.to_bytes()) == r
+
+
+def test_encoding():
+    assert Ranges("").to_bytes() == b"\x00"
+    assert Ranges("5:").to_bytes() == b"\x01\x05\x00"
+    assert Ranges("1:3,200").to_bytes() == b"\x02\x01\x02\xc5\x01\x01"
+
+
+def test_smaller_than_string():
+    r = Ranges(list(range(0, 100_000, 2)))
+
+    assert len(r.to_bytes()) * 2 < len(str(r))
+
+
+def test_accepts_buffers(numpy):
+    data = Ranges("1:3,5").to_bytes()
+
+    assert Ranges.from_bytes(bytearray(data)) == "1:3,5"
+    assert Ranges.from_bytes(memoryview(data)) == "1:3,5"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",  # nothing
+        b"\x01\x05",  # missing length
+        b"\x01\x05\x80",  # truncated varint
+        b"\x01\x05\x01\x00",  # trailing data
+        b"\x02\x01\x01\x00\x01",  # touching segments
+        b"\x02\x01\x00\x05\x01",  # unbounded segment that isn't last
+        b"\x01" + b"\xff" * 9 + b"\x01\x01",  # too big
+    ],
+)
+def test_invalid(numpy, data):
+    with pytest.raises(ValueError):
+        Ranges.from_bytes(data)
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+from arranges import Ranges, Segment, inf
+from arranges import bitmap
+from arranges.bitmap import Bitmap
+from arranges.parse import merge_pairs
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def small_chunks(request, monkeypatch):
+    """
+    Chunks of 64 values that become bitmaps with 4 segments in them, so
+    small ranges can be tested
+    """
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(bitmap, "NUMPY", request.param)
+    monkeypatch.setattr(bitmap, "CHUNK_BITS", 6)
+    monkeypatch.setattr(bitmap, "CHUNK", 64)
+    monkeypatch.setattr(bitmap, "DENSE_RUNS", 4)
+
+
+def random_bounds(rng):
+    pairs = []
+    pos = rng.randrange(100)
+    for _ in range(rng.randrange(60)):
+        length = rng.choice([1, 1, 1, 2, 3, 50, 200])
+        pairs.append((pos, pos + length))
+        pos += length + rng.choice([1, 1, 2, 5, 100])
+    if rng.random() < 0.3:
+        pairs.append((pos, inf.huge))
+    return merge_pairs(pairs)
+
+
+def every_other(start, stop):
+    return Ranges(",".join(map(str, range(start, stop, 2))))
+
+
+def test_every_other_value_is_a_bitmap():
+    r = every_other(0, 100_000)
+
+    assert isinstance(r._store, Bitmap)
+    assert r == ",".join(str(i) for i in range(0, 100_000, 2))
+    assert 100 in r and 101 not in r
+    assert len(r) == 50_000
+
+
+def test_bitmap_is_unpacked_once():
+    r = every_other(0, 100_000)
+
+    assert (r.first, r.last) == (0, 99_998)
+    assert r in Segment(0, 100_000)
+    assert not hasattr(r, "_unpacked")
+
+    assert r._bounds is r._bounds
+
+
+def test_sparse_stays_as_bounds():
+    r = Ranges(list(range(0, 2_000_000, 1000)))
+
+    assert isinstance(r._store, tuple)
+
+
+def test_operators_on_bitmaps():
+    evens, odds = every_other(0, 100_000), every_other(1, 100_000)
+
+    assert evens & odds == ""
+    assert not evens & odds
+    assert not evens - evens
+    assert evens | odds == ":100000"
+    assert evens - odds == evens
+    assert evens & ":10" == "0,2,4,6,8"
+    assert evens | "50000:" == str(every_other(0, 50_000)) + ",50000:"
+
+
+def test_containment_on_bitmaps():
+    evens = every_other(0, 100_000)
+
+    assert evens in evens
+    assert evens <= evens
+    assert "2,4,6" in evens
+    assert "2,3" not in evens
+
+
+def test_packing(small_chunks):
+    rng = random.Random(1)
+    packed = 0
+    for _ in range(200):
+        bounds = random_bounds(rng)
+        store = bitmap.pack(bounds)
+        if isinstance(store, Bitmap):
+            packed += 1
+            assert store.bounds() == bounds
+    assert packed
+
+
+def test_same_as_bounds(small_chunks, monkeypatch):
+    rng = random.Random(2)
+    for _ in range(100):
+        a, b = random_bounds(rng), random_bounds(rng)
+
+        with monkeypatch.context() as m:
+            m.setattr(bitmap, "DENSE_RUNS", 10**9)
+            plain_a, plain_b = Ranges._from_bounds(a), Ranges._from_bounds(b)
+        packed_a, packed_b = Ranges._from_bounds(a), Ranges._from_bounds(b)
+
+        assert packed_a == plain_a
+        assert packed_a & packed_b == plain_a & plain_b
+        assert packed_a | packed_b == plain_a | plain_b
+        assert packed_a - packed_b == plain_a - plain_b
+        assert packed_a & plain_b == plain_a & plain_b
+        assert packed_a.__len__() == plain_a.__len__()
+        assert (packed_a.first, packed_a.last) == (plain_a.first, plain_a.last)
+        assert [v in packed_a for v in range(300)] == [v in plain_a for v in range(300)]
@@ -0,0 +1,43 @@
+import pytest
+from arranges import Ranges
+
+
+def test_coalesce():
+    r = Ranges("0:10,12:20,30:40,100")
+
+    assert r.coalesce(0) == r
+    assert r.coalesce(2) == ":20,30:40,100"
+    assert r.coalesce(10) == ":40,100"
+    assert r.coalesce(60) == ":101"
+
+
+def test_coalesce_unbounded():
+    assert Ranges("1:5,8:").coalesce(3) == "1:"
+
+
+def test_coalesce_empty():
+    assert Ranges("").coalesce(100) == ""
+
+
+def test_coalesce_overhead():
+    r = Ranges("0:10,12:20,30:40,100")
+
+    assert r.coalesce_overhead(0) == 0
+    assert r.coalesce_overhead(2) == 2
+    assert r.coalesce_overhead(10) == 12
+    assert r.coalesce_overhead(60) == 72
+
+
+def test_overhead_matches_lengths():
+    r = Ranges("3,5:9,20,25:30,1000:1003")
+
+    for gap in range(0, 1000, 7):
+        assert len(r.coalesce(gap)) - len(r) == r.coalesce_overhead(gap)
+
+
+def test_negative_gap():
+    with pytest.raises(ValueError):
+        Ranges("1,3").coalesce(-1)
+
+    with pytest.raises(ValueError):
+        Ranges("1,3").coalesce_overhead(-1)
@@ -0,0 +1,36 @@
+from array import array
+
+import pytest
+from arranges import Ranges
+from arranges import ranges as ranges_module
+
+
+numpy_module = ranges_module
+
+
+def test_matches_in(numpy):
+    r = Ranges("2:5,10,20:")
+    values = list(range(30)) + [-1, 2**62]
+
+    assert list(r.contains_many(values)) == [v in r for v in values]
+
+
+def test_accepts_array_and_generator(numpy):
+    r = Ranges("2:5")
+
+    assert list(r.contains_many(array("q", [1, 2, 4, 5]))) == [0, 1, 1, 0]
+    assert list(r.contains_many(i for i in range(6))) == [0, 0, 1, 1, 1, 0]
+
+
+def test_empty(numpy):
+    assert list(Ranges("").contains_many([0, 1, 2])) == [False] * 3
+    assert list(Ranges("1:").contains_many([])) == []
+
+
+def test_numpy_returns_mask():
+    np = pytest.importorskip("numpy")
+
+    mask = Ranges("10:20").contains_many(np.arange(30, dtype=np.int64))
+
+    assert mask.dtype == bool
+    assert mask.sum() == 10
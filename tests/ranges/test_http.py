@@ -0,0 +1,76 @@
+import pytest
+from arranges import Ranges
+
+
+def test_from_http_range():
+    r = Ranges.from_http_range("bytes=0-99,200-,-500", length=1000)
+
+    assert r == ":100,200:1000"
+
+
+def test_suffix_longer_than_content():
+    assert Ranges.from_http_range("bytes=-500", length=100) == ":100"
+
+
+def test_cut_off_at_length():
+    assert Ranges.from_http_range("bytes=50-5000,9000-", length=100) == "50:100"
+
+
+def test_no_length():
+    assert Ranges.from_http_range("bytes=10-19, 40-") == "10:20,40:"
+
+    with pytest.raises(ValueError):
+        Ranges.from_http_range("bytes=-10")
+
+
+def test_overlapping_and_unsorted():
+    r = Ranges.from_http_range("bytes=50-59,0-9,5-14,,", length=100)
+
+    assert r == ":15,50:60"
+
+
+@pytest.mark.parametrize(
+    "header",
+    ["items=0-5", "0-5", "bytes=5-1", "bytes=a-b", "bytes=-", "bytes=1-2-3"],
+)
+def test_malformed(header):
+    with pytest.raises(ValueError):
+        Ranges.from_http_range(header, length=100)
+
+
+def test_not_satisfiable():
+    with pytest.raises(ValueError, match="not satisfiable"):
+        Ranges.from_http_range("bytes=100-,-0", length=100)
+
+
+def test_too_many_segments():
+    header = "bytes=" + ",".join(f"{i * 2}-{i * 2}" for i in range(11))
+
+    with pytest.raises(ValueError):
+        Ranges.from_http_range(header, length=100, max_segments=10)
+    assert len(Ranges.from_http_range(header, length=100, max_segments=11)) == 11
+
+
+def test_to_http_range():
+    assert Ranges(":100,200:").to_http_range() == "bytes=0-99,200-"
+    assert Ranges("5").to_http_range() == "bytes=5-5"
+
+    with pytest.raises(ValueError):
+        Ranges("").to_http_range()
+
+
+def test_round_trip():
+    r = Ranges("0:10,20,30:")
+
+    assert Ranges.from_http_range(r.to_http_range()) == r
+
+
+def test_content_ranges():
+    r = Ranges(":100,200:")
+
+    assert r.content_ranges(1000) == ["bytes 0-99/1000", "bytes 200-999/1000"]
+    assert r.content_ranges(150) == ["bytes 0-99/150"]
+    assert Ranges("5:10").content_ranges() == ["bytes 5-9/*"]
+
+    with pytest.raises(ValueError):
+        r.content_ranges()
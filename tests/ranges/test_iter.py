@@ -0,0 +1,60 @@
+from itertools import islice
+
+import pytest
+from arranges import Ranges, Segment, inf
+
+
+def test_iter_values():
+    assert list(Ranges("1:3,5,8:10")) == [1, 2, 5, 8, 9]
+    assert list(Ranges("")) == []
+
+
+def test_iter_unbounded():
+    assert list(islice(Ranges("2,5:"), 4)) == [2, 5, 6, 7]
+
+
+def test_segment_iter():
+    assert list(Segment(3, 6)) == [3, 4, 5]
+    assert list(Segment(0, 0)) == []
+    assert list(islice(Segment(7, inf), 3)) == [7, 8, 9]
+
+
+def test_iter_ranges():
+    assert list(Ranges("1:3,5,8:10").iter_ranges()) == [
+        range(1, 3),
+        range(5, 6),
+        range(8, 10),
+    ]
+    assert list(Ranges("").iter_ranges()) == []
+    assert list(Ranges("4:").iter_ranges()) == [range(4, inf.huge)]
+
+
+def test_iter_chunks():
+    chunks = list(Ranges("0:5,7,10:12").iter_chunks(2))
+
+    assert chunks == [
+        range(0, 2),
+        range(2, 4),
+        range(4, 5),
+        range(7, 8),
+        range(10, 12),
+    ]
+
+
+def test_iter_chunks_unbounded():
+    chunks = Ranges("10:").iter_chunks(3)
+
+    assert list(islice(chunks, 2)) == [range(10, 13), range(13, 16)]
+
+
+def test_iter_chunks_bad_size():
+    with pytest.raises(ValueError):
+        list(Ranges("1:5").iter_chunks(0))
+
+
+def test_iter_chunks_as_array():
+    pytest.importorskip("numpy")
+    chunks = list(Ranges("0:5,7,10:12").iter_chunks(3, as_array=True))
+
+    assert [chunk.tolist() for chunk in chunks] == [[0, 1, 2], [3, 4, 7], [10, 11]]
+    assert list(Ranges("").iter_chunks(3, as_array=True)) == []
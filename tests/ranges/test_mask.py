@@ -0,0 +1,58 @@
+import pytest
+from arranges import Ranges
+from arranges import mask as mask_module
+
+
+numpy_module = mask_module
+
+
+def test_to_mask(numpy):
+    mask = Ranges("1:3,5").to_mask(7)
+
+    assert list(mask) == [False, True, True, False, False, True, False]
+
+
+def test_to_mask_cuts_off_at_length(numpy):
+    assert list(Ranges("2:").to_mask(4)) == [False, False, True, True]
+    assert list(Ranges("10:20").to_mask(4)) == [False] * 4
+    assert list(Ranges("1").to_mask(0)) == []
+
+
+def test_to_mask_negative_length(numpy):
+    with pytest.raises(ValueError):
+        Ranges("1").to_mask(-1)
+
+
+def test_from_mask(numpy):
+    mask = [0, 1, 1, 0, 0, 1, 1]
+
+    assert Ranges.from_mask(mask) == "1:3,5:7"
+    assert Ranges.from_mask([]) == ""
+
+
+def test_packed(numpy):
+    packed = Ranges("1:3,8:18").to_mask(20, packed=True)
+
+    assert packed == bytearray([0b01100000, 0b11111111, 0b11000000])
+    assert Ranges.from_mask(packed) == "1:3,8:18"
+    assert Ranges.from_mask(bytes(packed)) == "1:3,8:18"
+
+
+def test_packed_runs_to_the_end(numpy):
+    assert Ranges.from_mask(b"\x00\x0f\xff") == "12:24"
+
+
+@pytest.mark.parametrize("text", ["", "0", "7:9", "3:5,6,13:17,31", "40:"])
+def test_round_trip(numpy, text):
+    ranges = Ranges(text)
+
+    assert Ranges.from_mask(ranges.to_mask(64)) == ranges & ":64"
+    assert Ranges.from_mask(ranges.to_mask(64, packed=True)) == ranges & ":64"
+
+
+def test_numpy_bool_array():
+    np = pytest.importorskip("numpy")
+    mask = np.array([True, False, True, True])
+
+    assert Ranges.from_mask(mask) == "0,2:4"
+    assert Ranges("0,2:4").to_mask(4).dtype == bool
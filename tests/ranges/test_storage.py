@@ -0,0 +1,31 @@
+from arranges import Ranges, Segment, inf
+
+
+def test_segments_are_lazy():
+    r = Ranges("1:5,10:")
+    assert "_segments" not in r.__dict__
+
+    assert r.segments == (Segment(1, 5), Segment(10, inf))
+    assert r.segments is r.segments
+
+
+def test_operators_dont_create_segments():
+    a = Ranges("1:5,10:20")
+    b = Ranges("3:12")
+
+    for result in (a & b, a | b, a - b, ~a):
+        assert "_segments" not in result.__dict__
+    assert "_segments" not in a.__dict__
+    assert "_segments" not in b.__dict__
+
+
+def test_empty_still_has_a_segment():
+    assert Ranges("").segments == (Segment(0, 0),)
+    assert (Ranges("1:5") & "10:").segments == (Segment(0, 0),)
+
+
+def test_unbounded_stop_is_inf():
+    r = Ranges("10:")
+    assert r.segments[0].stop is inf
+    assert r.last == inf
+    assert str(~Ranges(":10")) == "10:"
@@ -0,0 +1,69 @@
+import mmap
+from array import array
+
+import pytest
+from arranges import Ranges
+
+
+def test_take_bytes():
+    views = Ranges("1:3,5").take(b"abcdefgh")
+
+    assert all(isinstance(view, memoryview) for view in views)
+    assert [bytes(view) for view in views] == [b"bc", b"f"]
+
+
+def test_take_is_a_view():
+    data = bytearray(b"abcdef")
+    views = Ranges("2:4").take(data)
+
+    data[2] = ord("X")
+
+    assert bytes(views[0]) == b"Xd"
+
+
+def test_take_past_the_end():
+    assert [bytes(v) for v in Ranges("3:,20").take(b"abcdef")] == [b"def"]
+    assert Ranges("10:").take(b"abc") == []
+    assert Ranges("").take(b"abc") == []
+
+
+def test_take_uses_items_not_bytes():
+    values = array("q", [10, 20, 30, 40])
+
+    assert [v.tolist() for v in Ranges("1,3").take(values)] == [[20], [40]]
+
+
+def test_take_mmap():
+    with mmap.mmap(-1, 16) as buffer:
+        buffer[:] = bytes(range(16))
+        views = Ranges("2:4,10").take(buffer)
+
+        assert [bytes(view) for view in views] == [b"\x02\x03", b"\x0a"]
+        for view in views:
+            view.release()
+
+
+def test_take_into():
+    out = bytearray(8)
+
+    assert Ranges("1:3,5:").take_into(b"abcdefg", out) == 4
+    assert out[:4] == b"bcfg"
+
+
+def test_take_into_too_small():
+    with pytest.raises(ValueError):
+        Ranges("0:4").take_into(b"abcdef", bytearray(3))
+
+
+def test_take_numpy_rows():
+    np = pytest.importorskip("numpy")
+    rows = np.arange(12).reshape(6, 2)
+    r = Ranges("1,3:5")
+
+    views = r.take(rows)
+    assert [view.tolist() for view in views] == [[[2, 3]], [[6, 7], [8, 9]]]
+    assert np.shares_memory(views[0], rows)
+
+    out = np.zeros((3, 2), dtype=rows.dtype)
+    assert r.take_into(rows, out) == 3
+    assert (out == rows[[1, 3, 4]]).all()
@@ -0,0 +1,54 @@
+import pytest
+
+from arranges import Ranges, Segment, inf
+
+
+def test_from_bounds_matches_constructor():
+    for start, stop in [(0, 0), (0, 1), (5, 6), (0, 10), (3, 10), (0, inf), (7, inf)]:
+        trusted = Segment._from_bounds(start, stop)
+        checked = Segment(start, stop)
+
+        assert trusted == checked
+        assert str(trusted) == str(checked)
+        assert (trusted.start, trusted.stop) == (checked.start, checked.stop)
+
+
+def test_constructor_still_validates():
+    with pytest.raises(ValueError):
+        Segment(10, 5)
+
+    with pytest.raises(ValueError):
+        Segment(-1, 5)
+
+
+def test_huge_stop_is_unbounded():
+    seg = Segment(5, inf.huge)
+
+    assert seg == "5:"
+    assert seg.stop is inf
+
+
+@pytest.mark.parametrize(
+    "args", [(0, 2**70), (2**70, None), (5, inf.huge + 1)], ids=str
+)
+def test_past_huge_is_an_error(args):
+    with pytest.raises(ValueError):
+        Segment(*args)
+    with pytest.raises(ValueError):
+        Ranges(*args)
+    with pytest.raises(ValueError):
+        Ranges(f"{args[0]}:{args[1] or ''}")
+
+
+def test_segments_from_ranges_keep_bounds():
+    ranges = Ranges("1:5,10,20:")
+
+    assert [(s.start, s.stop) for s in ranges.segments] == [(1, 5), (10, 11), (20, inf)]
+    assert ranges.segments[-1].stop is inf
+
+
+def test_union_of_segments():
+    joined = Segment(0, 5) | Segment(5, inf)
+
+    assert joined == ":"
+    assert joined.stop is inf
@@ -1,5 +1,5 @@
 import pytest
-from arranges import Segment
+from arranges import Ranges, Segment
 
 
 def test_contains_with_empty_segment():
@@ -110,3 +110,16 @@ def test_contains_with_segments():
 
     # Empty segment
     assert Segment(0, 0) in s
+
+
+def test_contains_with_ranges():
+    """Ranges are checked against the segment's bounds"""
+    s = Segment(5, 15)
+
+    assert Ranges("5:10,12") in s
+    assert Ranges("5:15") in s
+    assert Ranges("") in s
+    assert Ranges("4:10") not in s
+    assert Ranges("5:10,15") not in s
+    assert Ranges("10:") not in s
+    assert Ranges("10:") in Segment(5, None)